@@ -224,7 +224,8 @@ export class GoogleCalendarService {
    * Creates a single (non-recurring) Google Calendar event
    */
   private createSingleGoogleEvent(event: EventConfigDto): object {
-    const eventDate = new Date(event.date!);
+    // Dates arrive as ISO dates; read them as local midnight, not UTC
+    const eventDate = new Date(`${event.date!}T00:00:00`);
     const startDate = new Date(eventDate);
     const endDate = new Date(eventDate);
 
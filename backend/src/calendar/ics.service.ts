@@ -104,7 +104,8 @@ export class IcsService {
    * @returns VEVENT string without RRULE
    */
   createSingleEvent(event: EventConfigDto): string {
-    const eventDate = new Date(event.date!);
+    // Dates arrive as ISO dates; read them as local midnight, not UTC
+    const eventDate = new Date(`${event.date!}T00:00:00`);
     const dtstart = this.formatDateTime(eventDate, event.startTime);
     const dtend = this.formatDateTime(eventDate, event.endTime);
 
@@ -14,8 +14,10 @@ export interface ParsedEvent {
     startTime: string;
     endTime: string;
     venue: string;
+    venues?: string[];
     semester?: string;
     isRecurring: boolean;
+    fingerprint?: string;
 }
 
 export enum JobStatus {
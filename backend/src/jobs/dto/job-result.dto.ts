@@ -93,6 +93,18 @@ export class ParsedEventDto implements ParsedEvent {
   @IsString()
   venue!: string;
 
+  @ApiPropertyOptional({
+    description:
+      'Every venue of an event held in several venues at once, when the ' +
+      'PDF worker merged them. venue then lists them comma-separated.',
+    example: ['Informatorium Grey Lab', 'Informatorium Orange Lab'],
+    type: [String],
+  })
+  @IsOptional()
+  @IsArray()
+  @IsString({ each: true })
+  venues?: string[];
+
   @ApiProperty({
     description:
       'Whether this is a recurring weekly event. ' +
@@ -102,6 +114,16 @@ export class ParsedEventDto implements ParsedEvent {
   })
   @IsBoolean()
   isRecurring!: boolean;
+
+  @ApiPropertyOptional({
+    description:
+      'Hash of the event\'s fields from the PDF worker. ' +
+      'Changes whenever the event does; send back as `previous` to get only changes.',
+    example: '3f2a9c1e0b7d4e65',
+  })
+  @IsOptional()
+  @IsString()
+  fingerprint?: string;
 }
 
 export class JobResultDto {
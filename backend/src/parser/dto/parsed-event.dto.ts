@@ -4,6 +4,7 @@ import {
   IsString,
   IsOptional,
   IsBoolean,
+  IsArray,
   Matches,
 } from 'class-validator';
 
@@ -63,9 +64,25 @@ export class ParsedEventDto {
   @IsString()
   venue!: string;
 
+  @ApiPropertyOptional({
+    description: 'Every venue of an event held in several venues at once',
+    type: [String],
+  })
+  @IsOptional()
+  @IsArray()
+  @IsString({ each: true })
+  venues?: string[];
+
   @ApiProperty({
     description: 'Whether this is a recurring weekly event',
   })
   @IsBoolean()
   isRecurring!: boolean;
+
+  @ApiPropertyOptional({
+    description: 'Hash of the event fields; changes whenever the event does',
+  })
+  @IsOptional()
+  @IsString()
+  fingerprint?: string;
 }
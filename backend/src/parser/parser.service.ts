@@ -9,6 +9,22 @@ export interface ParserResponse {
   events: ParsedEvent[];
 }
 
+interface ParserJob {
+  id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  // The Fly.io machine whose queue holds the job; null outside Fly
+  machineId?: string | null;
+  result?: ParserResponse;
+  error?: { statusCode: number; error: string; details: string };
+}
+
+// A queued parse is first polled after JOB_FIRST_POLL_MS, which covers
+// small PDFs and cache hits, then at doubling intervals up to
+// JOB_MAX_POLL_INTERVAL_MS; it is waited for JOB_TIMEOUT_MS at most
+const JOB_FIRST_POLL_MS = 50;
+const JOB_MAX_POLL_INTERVAL_MS = 1000;
+const JOB_TIMEOUT_MS = 300000;
+
 @Injectable()
 export class ParserService {
   private readonly logger = new Logger(ParserService.name);
@@ -34,34 +50,32 @@ export class ParserService {
     formData.append('type', pdfType);
 
     try {
-      const response = await firstValueFrom(
-        this.httpService.post<any>(
-          `${this.parserUrl}/parse`,
+      // The PDF is queued as a job and polled for, so no connection is
+      // held open (and no worker tied up) for the length of the parse
+      const submitted = await firstValueFrom(
+        this.httpService.post<ParserJob>(
+          `${this.parserUrl}/jobs`,
           formData,
           {
             headers: formData.getHeaders(),
-            timeout: 60000, // 60 second timeout for PDF parsing
+            timeout: 30000,
           },
         ),
       );
+      const result = await this.waitForJob(
+        submitted.data.id,
+        submitted.data.machineId ?? undefined,
+      );
 
       this.logger.log(
-        `Parser returned ${response.data.events.length} events`,
+        `Parser returned ${result.events.length} events`,
       );
 
-      // Transform Python worker response to match backend ParsedEvent interface
-      const transformedEvents: ParsedEvent[] = response.data.events.map((event: any, index: number) => ({
+      // The worker returns events in ParsedEvent shape with stable ids
+      // derived from their content; random ids are only a fallback
+      const transformedEvents: ParsedEvent[] = result.events.map((event: ParsedEvent, index: number) => ({
+        ...event,
         id: event.id || this.generateEventId(event, index),
-        module: event.Module || event.module || '',
-        semester: event.Offered || event.offered,
-        activity: event.Activity || event.activity || '',
-        group: event.Group || event.group,
-        day: event.Day || event.day,
-        date: event.Date || event.date,
-        startTime: event.start_time || event.startTime || '',
-        endTime: event.end_time || event.endTime || '',
-        venue: event.Venue || event.venue || event.location || '',
-        isRecurring: event.isRecurring !== undefined ? event.isRecurring : true,
       }));
 
       return transformedEvents;
@@ -73,6 +87,36 @@ export class ParserService {
     }
   }
 
+  /**
+   * Poll a parser job until it is done and return its result.
+   * Jobs are queued per machine, so polls are pinned to the machine
+   * that took the job through Fly's proxy
+   */
+  private async waitForJob(jobId: string, machineId?: string): Promise<ParserResponse> {
+    const headers = machineId ? { 'fly-force-instance-id': machineId } : undefined;
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    let interval = JOB_FIRST_POLL_MS;
+    while (Date.now() < deadline) {
+      await new Promise((resolve) => setTimeout(resolve, interval));
+      interval = Math.min(interval * 2, JOB_MAX_POLL_INTERVAL_MS);
+      const { data: job } = await firstValueFrom(
+        this.httpService.get<ParserJob>(`${this.parserUrl}/jobs/${jobId}`, {
+          headers,
+          timeout: 10000,
+        }),
+      );
+      if (job.status === 'done' && job.result) {
+        return job.result;
+      }
+      if (job.status === 'failed') {
+        throw new Error(
+          `${job.error?.error ?? 'Parsing failed'}: ${job.error?.details ?? 'unknown error'}`,
+        );
+      }
+    }
+    throw new Error(`Parser job ${jobId} did not finish in time`);
+  }
+
   /**
    * Generate a unique ID for an event based on its properties
    */
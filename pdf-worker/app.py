@@ -5,21 +5,185 @@ This service wraps the V2 Python PDF parser and exposes it via HTTP API
 for use by the NestJS backend.
 """
 
+import asyncio
 import os
-import tempfile
-from typing import Dict, Any
+import signal
+import time
+from typing import Callable, Dict, Any, Iterator, List, Literal, Optional, Tuple
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+# Start of the app's import, for the startup timings
+IMPORT_STARTED = time.perf_counter()
 
-from parser import parse_pdf, process_events
+import orjson
+from fastapi import FastAPI, File, Form, Header, Query, Request, UploadFile, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from parser import Deadline, EventIndex, StageTimings, iter_pdf_events, process_events
+from service import (
+    COLUMNAR_MEDIA_TYPE, METRICS_CONTENT_TYPE, JobProgress, JobQueue,
+    JobQueueFullException, ParseCache, ParsePool, PoolSaturatedException,
+    PoolTimeoutException, ProfileStore, StartupTimer, TooManyFilesException,
+    UploadTooLargeException, collapsed, columnar_payload, content_digest,
+    diff_events, observe_cache, observe_parse, observe_pool, observe_stages,
+    observe_startup, parse_previous, parse_schedule_file, profile_schedule_file,
+    process_memory_limit, pss, pstats_text, read_upload, read_zip_pdfs, render_metrics,
+    wants_columnar,
+)
 
 app = FastAPI(
     title="PDF Worker",
     description="Microservice for parsing Tuks schedule PDFs",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Parse results keyed on upload content, shared by all workers on the machine
+parse_cache = ParseCache.from_env()
+
+# CPU-bound parsing runs here so the event loop (and /health) stays responsive
+parse_pool = ParsePool.from_env(on_change=observe_pool)
+
+# Profiles of parses that asked for one (or were sampled), shared by all
+# workers on the machine; off for requests unless PROFILE_TOKEN is set
+profile_store = ProfileStore.from_env()
+
+# Parse jobs submitted to POST /jobs, shared by all workers on the machine
+job_queue = JobQueue.from_env()
+
+# Largest upload accepted, matching the backend's own limit
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+
+# Most PDFs accepted by one /parse/batch request (zip members included),
+# and most bytes its zip archives may decompress to altogether
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "10"))
+BATCH_MAX_ZIP_BYTES = int(os.getenv("BATCH_MAX_ZIP_BYTES", str(50 * 1024 * 1024)))
+
+# Per-request parse deadline: default, upper bound for X-Request-Timeout, and
+# how long past the deadline a stuck pool process is given before it is killed
+PARSE_TIMEOUT = float(os.getenv("PARSE_TIMEOUT", "60"))
+PARSE_MAX_TIMEOUT = float(os.getenv("PARSE_MAX_TIMEOUT", "120"))
+PARSE_KILL_GRACE = float(os.getenv("PARSE_KILL_GRACE", "2"))
+
+# Opt-in parallel page extraction for large PDFs: processes per parse
+# (1 disables it) and the page count from which it is used
+PARSE_EXTRACT_WORKERS = int(os.getenv("PARSE_EXTRACT_WORKERS", "1"))
+PARSE_PARALLEL_MIN_PAGES = int(os.getenv("PARSE_PARALLEL_MIN_PAGES", "20"))
+
+# Table extraction engine used unless a request picks one: 'auto' (word
+# binning for lecture PDFs, pdfplumber tables otherwise), 'tables' or 'words'
+PARSE_ENGINE = os.getenv("PARSE_ENGINE", "auto")
+
+# PDF library parses run on: 'pdfplumber', or 'pymupdf' (native, much
+# faster; needs the pymupdf package)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pdfplumber")
+
+# A worker whose PSS is above this many MB after a parse request stops
+# itself gracefully, replacing request-count recycling (--max-requests):
+# gunicorn starts a fresh worker, forked from the warm master, while
+# workers that stay small keep running. 'auto' derives it from the
+# machine's memory (see process_memory_limit); the default, 0, never
+# stops, as nothing restarts a worker outside gunicorn. Pool processes are
+# recycled separately (PARSE_POOL_MAX_PSS_MB)
+WORKER_MAX_PSS = process_memory_limit("WORKER_MAX_PSS_MB", parse_pool.workers, default='0')
+
+# Whether this worker has already asked to be stopped for its memory use
+_retiring = False
+
+# Deadline of a queued job's parse; nobody is waiting on a connection, so
+# it defaults to the longest a request may ask for
+JOBS_PARSE_TIMEOUT = float(os.getenv("JOBS_PARSE_TIMEOUT", str(PARSE_MAX_TIMEOUT)))
+
+# Seconds between this worker's checks for jobs submitted to other workers
+# (its own submissions wake it at once) and for expired jobs to delete
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+JOBS_PURGE_INTERVAL = 60.0
+
+# Jobs this worker runs at once. Each takes a parse pool slot, so this
+# leaves the pool's queue to /parse requests
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", str(parse_pool.workers)))
+
+# How long a claimed job is this worker's before another may take it over:
+# the parse's deadline and kill grace, plus slack for storing the result
+JOBS_LEASE = JOBS_PARSE_TIMEOUT + PARSE_KILL_GRACE + 30
+
+# The job drainer: its task, what wakes it, and the claim tokens and tasks
+# of the jobs it is running, by id
+_jobs_drainer: Optional[asyncio.Task] = None
+_jobs_wakeup: Optional[asyncio.Event] = None
+_jobs_running: Dict[str, Tuple[str, asyncio.Task]] = {}
+
+# Values of the optional `type` form field (the backend's PdfType)
+PDFTypeField = Literal['lecture', 'test', 'exam']
+
+# Values of the optional `engine` form field
+EngineField = Literal['auto', 'tables', 'words']
+
+# Formats a kept profile can be downloaded in
+ProfileFormat = Literal['text', 'pstats', 'collapsed']
+
+# PDFs parsed once before serving, so the first parse request does not pay
+# for loading the parser's tables (default none). Importing the app does
+# not warm up; gunicorn.conf.py calls warm_up() in a preloading master,
+# once, before the workers fork
+WARMUP_DIR = os.getenv("WARMUP_DIR", "")
+
+# How long this worker took to start serving
+startup = StartupTimer(IMPORT_STARTED)
+
+
+def warm_up() -> None:
+    """Parses the PDFs in WARMUP_DIR once in this process, if it is set."""
+    if WARMUP_DIR:
+        startup.warm_up(WARMUP_DIR, PARSE_ENGINE, PDF_BACKEND)
+
+
+@app.on_event("startup")
+def mark_startup_ready() -> None:
+    """Records when the server started serving in this worker."""
+    startup.ready()
+
+
+@app.on_event("startup")
+async def start_job_drainer() -> None:
+    """Starts running queued jobs in this worker."""
+    global _jobs_drainer, _jobs_wakeup
+    _jobs_wakeup = asyncio.Event()
+    _jobs_drainer = asyncio.create_task(_drain_jobs())
+
+
+@app.on_event("shutdown")
+def stop_job_drainer() -> None:
+    """
+    Stops running jobs, putting those still running back in the queue for
+    another worker (or this one, restarted). Runs before the parse pool
+    is shut down, so they are not failed by it.
+    """
+    if _jobs_drainer is not None:
+        _jobs_drainer.cancel()
+    for job_id, (claim, task) in list(_jobs_running.items()):
+        task.cancel()
+        job_queue.requeue(job_id, claim)
+    _jobs_running.clear()
+
+
+@app.on_event("shutdown")
+def shutdown_parse_pool() -> None:
+    """Stops the parse pool processes when the worker exits."""
+    parse_pool.shutdown()
+
+
+@app.exception_handler(PoolSaturatedException)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedException) -> JSONResponse:
+    """
+    Turns a full parse queue into a fast 503 the client can retry.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": {"error": "Server busy", "details": str(exc)}},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
@@ -32,19 +196,161 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy"}
 
 
-@app.post("/parse")
-async def parse_schedule(file: UploadFile = File(...)) -> Dict[str, Any]:
+@app.get("/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
     """
-    Parse a PDF file and return extracted schedule data.
+    Parse-result cache counters for this worker process.
+    
+    Returns:
+        JSON object with memory/disk hit counts, misses and hit ratio
+    """
+    return parse_cache.stats()
+
+
+@app.get("/startup/stats")
+async def startup_stats() -> Dict[str, Any]:
+    """
+    Startup timings of this worker process.
+    
+    Returns:
+        JSON object with the seconds of each startup phase, whether the
+        app was preloaded by the gunicorn master, and the warm-up's
+        file counts (see service.StartupTimer)
+    """
+    return startup.stats()
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    """
+    Prometheus metrics, summed over every worker and pool process.
+    
+    Returns:
+        Text exposition of the stage latency histograms, page, event,
+        cache and pool counters, and pool in-flight and queue gauges
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _check_profile_token(token: Optional[str]) -> None:
+    """
+    Admits a caller to the /profiles endpoints.
+    
+    Raises:
+        HTTPException: 404 if PROFILE_TOKEN is not set, 403 if the caller's
+            X-Profile-Token does not match it
+    """
+    if profile_store.token is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "Not found", "details": "Profiling is disabled"}
+        )
+    if not profile_store.authorized(token):
+        raise HTTPException(
+            status_code=403,
+            detail={"error": "Forbidden", "details": "Missing or wrong X-Profile-Token"}
+        )
+
+
+@app.get("/profiles")
+def list_profiles(x_profile_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+    """
+    Parse profiles kept on this machine.
+    
+    Returns:
+        JSON object with the profiling settings and a `profiles` array,
+        newest first, of each profile's id, trigger, PDF type and digest,
+        parse seconds and stack sample count
+    
+    Raises:
+        HTTPException: 404 if profiling is disabled, 403 without the token
+    """
+    _check_profile_token(x_profile_token)
+    return {
+        "rate": profile_store.rate,
+        "sampleIntervalMs": profile_store.sample_interval * 1000,
+        "profiles": profile_store.list(),
+    }
+
+
+@app.get("/profiles/flamegraph")
+def profile_flamegraph(x_profile_token: Optional[str] = Header(None)) -> Response:
+    """
+    Stack samples aggregated over every worker's parses since the last
+    reset, as collapsed stacks for flamegraph.pl or speedscope.
+    
+    Empty unless PROFILE_SAMPLE_INTERVAL_MS is set.
+    
+    Raises:
+        HTTPException: 404 if profiling is disabled, 403 without the token
+    """
+    _check_profile_token(x_profile_token)
+    return Response(profile_store.flamegraph(), media_type="text/plain")
+
+
+@app.delete("/profiles/flamegraph")
+def reset_profile_flamegraph(x_profile_token: Optional[str] = Header(None)) -> Dict[str, str]:
+    """Discards every worker's aggregated stack samples."""
+    _check_profile_token(x_profile_token)
+    profile_store.reset_flamegraph()
+    return {"status": "reset"}
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    fmt: ProfileFormat = Query('text', alias="format"),
+    x_profile_token: Optional[str] = Header(None),
+) -> Response:
+    """
+    Downloads one kept profile.
     
     Args:
-        file: PDF file upload
+        profile_id: Id from X-Profile-Id or /profiles
+        fmt: `format` query parameter; 'text' for pstats' report sorted by
+            cumulative time, 'pstats' for the binary dump (pstats.Stats,
+            snakeviz), 'collapsed' for its stack samples
         
+    Raises:
+        HTTPException: 404 if the profile is unknown or was evicted, or
+            profiling is disabled, 403 without the token
+    """
+    _check_profile_token(x_profile_token)
+    entry = profile_store.get(profile_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "Profile not found", "details": f"No kept profile '{profile_id}'"}
+        )
+    result = entry["result"]
+    if fmt == 'pstats':
+        return Response(
+            result["pstats"], media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+        )
+    if fmt == 'collapsed':
+        return Response(collapsed(result["stacks"] or {}), media_type="text/plain")
+    return Response(pstats_text(result["pstats"]), media_type="text/plain")
+
+
+@app.get("/pool/stats")
+async def pool_stats() -> Dict[str, int]:
+    """
+    Parse pool admission counters for this worker process.
+    
     Returns:
-        JSON object with events array and type field
-        
+        JSON object with capacity, in-flight, queued, rejected and
+        recycled counts
+    """
+    return parse_pool.stats()
+
+
+def _validate_upload(file: UploadFile) -> None:
+    """
+    Rejects uploads that are not PDFs by name or content type.
+    
     Raises:
-        HTTPException: 400 for invalid PDF, 500 for parsing errors
+        HTTPException: 400 for a non-PDF filename or content type
     """
     # Validate file type
     if not file.filename or not file.filename.lower().endswith('.pdf'):
@@ -59,35 +365,142 @@ async def parse_schedule(file: UploadFile = File(...)) -> Dict[str, Any]:
             status_code=400,
             detail={"error": "Invalid content type", "details": "Expected application/pdf"}
         )
+
+
+def _is_zip_upload(file: UploadFile) -> bool:
+    """Whether a batch upload is a zip archive of PDFs."""
+    return (
+        (file.filename or "").lower().endswith('.zip')
+        or file.content_type in ("application/zip", "application/x-zip-compressed")
+    )
+
+
+def _zip_members(content: bytes, max_files: int, max_bytes: int) -> List[Tuple[str, bytes]]:
+    """
+    Unpacks the PDFs in an uploaded zip archive.
+    
+    Args:
+        content: The archive's bytes
+        max_files: PDFs the batch still has room for
+        max_bytes: Decompressed bytes the batch's archives still have
+            room for
     
-    # Save uploaded file to temp location
-    temp_file = None
+    Raises:
+        HTTPException: 400 for a corrupt archive, 413 if any PDF in it is
+            over MAX_FILE_SIZE or they are over max_bytes together
+        TooManyFilesException: If it holds more than max_files PDFs
+    """
     try:
-        # Create temp file with .pdf extension
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        content = await file.read()
-        
-        # Check if file is empty
-        if len(content) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail={"error": "Empty file", "details": "The uploaded file is empty"}
-            )
-        
-        temp_file.write(content)
-        temp_file.close()
-        
-        # Parse the PDF
-        result = parse_pdf(temp_file.name)
+        return read_zip_pdfs(content, MAX_FILE_SIZE, max_files, max_bytes)
+    except UploadTooLargeException as e:
+        raise HTTPException(
+            status_code=413,
+            detail={"error": "File too large", "details": str(e)}
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid zip archive", "details": str(e)}
+        )
+
+
+async def _read_pdf_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """
+    Reads a validated upload into memory, hashing it on the way.
+    
+    Returns:
+        Tuple of the PDF bytes and their hex SHA-256 digest
         
-        # Process events for cleaner output
-        processed_events = process_events(result['events'])
+    Raises:
+        HTTPException: 413 for an upload over MAX_FILE_SIZE, 400 if empty
+    """
+    try:
+        content, digest = await read_upload(file, MAX_FILE_SIZE)
+    except UploadTooLargeException as e:
+        raise HTTPException(
+            status_code=413,
+            detail={"error": "File too large", "details": str(e)}
+        )
+    
+    # Check if file is empty
+    if len(content) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Empty file", "details": "The uploaded file is empty"}
+        )
+    return content, digest
+
+
+async def _parse_content(
+    content: bytes,
+    digest: str,
+    deadline: Deadline,
+    pdf_type: Optional[str] = None,
+    engine: Optional[str] = None,
+    merge_venues: bool = False,
+    profile: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Parses PDF bytes through the result cache and the parse pool.
+    
+    Args:
+        content: The PDF's bytes
+        digest: Their hex SHA-256, the cache key
+        deadline: Deadline for the parse
+        pdf_type: Type declared by the caller, or None to detect it
+        engine: Extraction engine requested by the caller, or None for
+            PARSE_ENGINE
+        merge_venues: Merge events that differ only in venue
+        profile: Profile the parse, bypassing the cache
+        progress: Picklable callback for the parse's page progress (see
+            parse_schedule_file); not called for cached results
         
-        return {
-            "events": processed_events,
-            "type": result['type']
-        }
+    Returns:
+        Tuple of the JSON object with events array and type field, and
+        the id of the parse's profile in profile_store, if one was taken
         
+    Raises:
+        HTTPException: 400 for invalid PDF, 500 for parsing errors
+        PoolSaturatedException: Parse queue full
+    """
+    # Identical uploads are parsed once. A declared type can be accepted
+    # where detection would fail, and an explicitly requested engine is
+    # often a cross-check, so those results are cached separately, as are
+    # results with merged venues
+    options = (pdf_type, engine, "venues" if merge_venues else None)
+    cache_key = "-".join([digest] + [value for value in options if value])
+    if not profile:
+        cached = parse_cache.get(cache_key)
+        observe_cache(cached is not None)
+        if cached is not None:
+            return cached, None
+    
+    trigger = profile_store.should_profile(profile)
+    args = (
+        content, deadline, PARSE_EXTRACT_WORKERS, PARSE_PARALLEL_MIN_PAGES,
+        pdf_type, engine or PARSE_ENGINE, PDF_BACKEND, merge_venues, progress,
+    )
+    result = None
+    try:
+        # Parse the PDF and process events in the pool. The parser stops
+        # itself at the deadline; the pool kills it if it cannot
+        timeout = deadline.remaining() + PARSE_KILL_GRACE
+        if trigger is None and not profile_store.sample_interval:
+            payload = await parse_pool.run(parse_schedule_file, *args, timeout=timeout)
+        else:
+            payload, result = await parse_pool.run(
+                profile_schedule_file, trigger is not None,
+                profile_store.sample_interval, *args, timeout=timeout
+            )
+    except PoolSaturatedException:
+        raise
+    except PoolTimeoutException as e:
+        # Reported like the parser's own timeout
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid PDF format", "details": f"PDF parsing timeout: {str(e)}"}
+        )
     except ValueError as e:
         # Invalid PDF format or unable to determine type
         raise HTTPException(
@@ -100,10 +513,528 @@ async def parse_schedule(file: UploadFile = File(...)) -> Dict[str, Any]:
             status_code=500,
             detail={"error": "Parsing failed", "details": str(e)}
         )
+    
+    parse_cache.put(cache_key, payload)
+    
+    profile_id = None
+    if trigger is not None:
+        profile_id = profile_store.add(result, trigger, payload["type"], digest)
+    elif result is not None and result["stacks"]:
+        profile_store.add_samples(result["stacks"])
+    return payload, profile_id
+
+
+def _request_deadline(requested_seconds: Optional[float]) -> Deadline:
+    """
+    Builds the parse deadline for a request.
+    
+    Args:
+        requested_seconds: Caller's X-Request-Timeout, if sent
+        
+    Returns:
+        Deadline of the requested seconds (capped at PARSE_MAX_TIMEOUT),
+        or PARSE_TIMEOUT when the caller did not ask for one
+        
+    Raises:
+        HTTPException: 400 for a non-positive timeout
+    """
+    if requested_seconds is None:
+        return Deadline(PARSE_TIMEOUT)
+    if requested_seconds <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid timeout", "details": "X-Request-Timeout must be positive"}
+        )
+    return Deadline(min(requested_seconds, PARSE_MAX_TIMEOUT))
+
+
+def _parse_request_done(response: Optional[Response] = None) -> None:
+    """
+    Publishes this worker's startup timings once it has answered a parse,
+    and retires the worker if it has outgrown WORKER_MAX_PSS.
+    
+    Args:
+        response: The request's response, if not yet sent; it then tells
+            the client not to reuse a connection to the retiring worker
+    """
+    global _retiring
+    if startup.first_request():
+        observe_startup(startup.phases)
+    if WORKER_MAX_PSS and not _retiring:
+        worker_pss = pss()
+        if worker_pss is not None and worker_pss > WORKER_MAX_PSS:
+            # The server's graceful shutdown: requests in progress finish
+            _retiring = True
+            os.kill(os.getpid(), signal.SIGTERM)
+            if response is not None:
+                response.headers["Connection"] = "close"
+
+
+def _too_many_files() -> HTTPException:
+    """The 400 for a batch of more than BATCH_MAX_FILES PDFs."""
+    return HTTPException(
+        status_code=400,
+        detail={
+            "error": "Too many files",
+            "details": f"A batch may contain at most {BATCH_MAX_FILES} PDFs"
+        }
+    )
+
+
+def _previous_fingerprints(previous: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Reads the optional `previous` form field.
+    
+    Returns:
+        Event id to fingerprint, or None when the field was not sent
+        
+    Raises:
+        HTTPException: 400 if the field is not a JSON object of strings
+    """
+    if previous is None:
+        return None
+    try:
+        return parse_previous(previous)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid previous", "details": str(e)}
+        )
+
+
+@app.post("/parse")
+async def parse_schedule(
+    file: UploadFile = File(...),
+    pdf_type: Optional[PDFTypeField] = Form(None, alias="type"),
+    engine: Optional[EngineField] = Form(None),
+    merge_venues: bool = Form(False),
+    previous: Optional[str] = Form(None),
+    x_request_timeout: Optional[float] = Header(None),
+    x_profile: bool = Header(False),
+    x_profile_token: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+) -> ORJSONResponse:
+    """
+    Parse a PDF file and return extracted schedule data.
+    
+    Args:
+        file: PDF file upload
+        pdf_type: Optional `type` form field; the schedule type the caller
+            already knows the PDF to be, which skips detection
+        engine: Optional `engine` form field overriding PARSE_ENGINE
+        merge_venues: Optional `merge_venues` form field; merges events
+            that differ only in venue into one event with a venue list
+        previous: Optional `previous` form field; JSON object of event id
+            to fingerprint from an earlier parse of the same schedule
+        x_request_timeout: Optional X-Request-Timeout header; seconds the
+            caller is willing to wait for the parse
+        x_profile: Optional X-Profile header; true profiles the parse
+            (bypassing the cache) and returns the profile's id in an
+            X-Profile-Id response header. Honoured only with the right
+            X-Profile-Token
+        x_profile_token: Optional X-Profile-Token header; PROFILE_TOKEN
+        accept: Accept header; COLUMNAR_MEDIA_TYPE selects the columnar
+            format, anything else gets JSON
+        
+    Returns:
+        JSON object with events array and type field, or its columnar
+        encoding (see service.columnar_payload). With `previous`, JSON
+        object with type and the added, changed, removed and unchanged
+        events instead (see service.diff_events)
+        
+    Raises:
+        HTTPException: 400 for invalid PDF or `previous`, 413 for
+            oversized uploads, 500 for parsing errors
+        PoolSaturatedException: Parse queue full (returned as 503)
+    """
+    _validate_upload(file)
+    deadline = _request_deadline(x_request_timeout)
+    previous_fingerprints = _previous_fingerprints(previous)
+    
+    # Parse stages are recorded by the pool; the request's own are recorded
+    # here once the PDF's type is known
+    timings = StageTimings()
+    with timings.time('upload_read'):
+        content, digest = await _read_pdf_upload(file)
+    payload, profile_id = await _parse_content(
+        content, digest, deadline, pdf_type, engine, merge_venues,
+        x_profile and profile_store.authorized(x_profile_token)
+    )
+    
+    # Responses are built here so FastAPI does not walk every event through
+    # jsonable_encoder; orjson serialises the plain dicts directly, as the
+    # response is constructed
+    with timings.time('encode'):
+        if previous_fingerprints is not None:
+            # Re-uploads only get what changed since the caller's copy
+            response = ORJSONResponse({
+                "type": payload["type"],
+                **diff_events(payload["events"], previous_fingerprints)
+            })
+        elif wants_columnar(accept):
+            response = ORJSONResponse(
+                columnar_payload(payload), media_type=COLUMNAR_MEDIA_TYPE,
+                headers={"Vary": "Accept"}
+            )
+        else:
+            response = ORJSONResponse(payload, headers={"Vary": "Accept"})
+    observe_stages(timings, payload["type"])
+    if profile_id is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    _parse_request_done(response)
+    return response
+
+
+@app.post("/parse/batch")
+async def parse_schedule_batch(
+    files: List[UploadFile] = File(...),
+    pdf_type: Optional[PDFTypeField] = Form(None, alias="type"),
+    engine: Optional[EngineField] = Form(None),
+    merge_venues: bool = Form(False),
+    x_request_timeout: Optional[float] = Header(None),
+) -> ORJSONResponse:
+    """
+    Parse several PDFs in one request.
+    
+    Accepts multiple `files` parts, each a PDF or a zip of PDFs. PDFs are
+    parsed concurrently on the parse pool, at most as many at a time as it
+    has processes, under one deadline. Errors are reported per file and
+    never fail the rest of the batch.
+    
+    Args:
+        files: PDF and/or zip file uploads
+        pdf_type: Optional `type` form field applied to every PDF
+        engine: Optional `engine` form field overriding PARSE_ENGINE
+        merge_venues: Optional `merge_venues` form field applied to every
+            PDF
+        x_request_timeout: Optional X-Request-Timeout header; seconds the
+            caller is willing to wait for the whole batch
+        
+    Returns:
+        JSON object with a `results` array in upload order. Each result
+        has `filename` and `status`, plus `events` and `type` on success
+        or `error` and `details` on failure
+        
+    Raises:
+        HTTPException: 400 if the batch holds more than BATCH_MAX_FILES PDFs
+    """
+    deadline = _request_deadline(x_request_timeout)
+    
+    # (filename, (bytes, digest)) to parse, or (filename, HTTPException).
+    # Reading stops at the first PDF past the limit, before it is
+    # decompressed
+    entries: List[Tuple[str, Any]] = []
+    zip_bytes = 0
+    for file in files:
+        if len(entries) >= BATCH_MAX_FILES:
+            raise _too_many_files()
+        try:
+            if _is_zip_upload(file):
+                content, _ = await _read_pdf_upload(file)
+                members = _zip_members(
+                    content, BATCH_MAX_FILES - len(entries), BATCH_MAX_ZIP_BYTES - zip_bytes
+                )
+                for name, member in members:
+                    zip_bytes += len(member)
+                    entries.append((name, (member, content_digest(member))))
+            else:
+                _validate_upload(file)
+                entries.append((file.filename, await _read_pdf_upload(file)))
+        except HTTPException as e:
+            entries.append((file.filename or "", e))
+        except TooManyFilesException:
+            raise _too_many_files()
+    
+    # Entries beyond the pool's processes would only wait in its queue,
+    # and past its capacity be rejected; they wait for a slot here instead
+    slots = asyncio.Semaphore(parse_pool.workers)
+    results = await asyncio.gather(*(
+        _batch_result(filename, entry, deadline, slots, pdf_type, engine, merge_venues)
+        for filename, entry in entries
+    ))
+    response = ORJSONResponse({"results": list(results)})
+    _parse_request_done(response)
+    return response
+
+
+async def _batch_result(
+    filename: str,
+    entry: Any,
+    deadline: Deadline,
+    slots: asyncio.Semaphore,
+    pdf_type: Optional[str] = None,
+    engine: Optional[str] = None,
+    merge_venues: bool = False,
+) -> Dict[str, Any]:
+    """
+    Parses one batch entry into its result object.
+    
+    Args:
+        filename: Name reported back for the entry
+        entry: The entry's (bytes, digest), or the HTTPException its
+            upload was already rejected with
+        deadline: Deadline shared by the whole batch
+        slots: Limits the batch's entries parsing at once
+        pdf_type: Type declared for the batch, or None to detect it
+        engine: Extraction engine requested for the batch, or None
+        merge_venues: Whether to merge events that differ only in venue
+        
+    Returns:
+        Result with `filename` and `status`, plus the payload or error
+    """
+    try:
+        if isinstance(entry, HTTPException):
+            raise entry
+        content, digest = entry
+        async with slots:
+            payload, _ = await _parse_content(
+                content, digest, deadline, pdf_type, engine, merge_venues
+            )
+    except HTTPException as e:
+        return {"filename": filename, "status": e.status_code, **e.detail}
+    except PoolSaturatedException as e:
+        return {
+            "filename": filename,
+            "status": 503,
+            "error": "Server busy",
+            "details": str(e),
+            "retryAfter": e.retry_after,
+        }
+    return {"filename": filename, "status": 200, **payload}
+
+
+@app.post("/parse/stream")
+async def parse_schedule_stream(
+    file: UploadFile = File(...),
+    pdf_type: Optional[PDFTypeField] = Form(None, alias="type"),
+    engine: Optional[EngineField] = Form(None),
+    x_request_timeout: Optional[float] = Header(None),
+) -> StreamingResponse:
+    """
+    Parse a PDF file and stream events page by page as NDJSON.
+    
+    The first line is {"type", "pages"}; each following line is
+    {"page", "events"} for one page, in page order, sent as soon as that
+    page is parsed. The last line is {"done": true, "count"} on success or
+    {"error", "details"} if parsing failed part-way through.
+    
+    The deadline is enforced cooperatively between pages and tables only.
+    
+    Args:
+        file: PDF file upload
+        pdf_type: Optional `type` form field; the schedule type the caller
+            already knows the PDF to be, which skips detection
+        engine: Optional `engine` form field overriding PARSE_ENGINE
+        x_request_timeout: Optional X-Request-Timeout header; seconds the
+            caller is willing to wait for the parse
+        
+    Returns:
+        application/x-ndjson streaming response
+        
+    Raises:
+        HTTPException: 400 for an invalid or unrecognised PDF, 413 for
+            oversized uploads
+        PoolSaturatedException: Parse queue full (returned as 503)
+    """
+    _validate_upload(file)
+    deadline = _request_deadline(x_request_timeout)
+    
+    timings = StageTimings()
+    with timings.time('upload_read'):
+        content, _ = await _read_pdf_upload(file)
+    
+    # Streams are parsed in a thread, but still count against the pool's
+    # admission limit; the slot is held until the stream finishes
+    parse_pool.acquire()
+    
+    pages = iter_pdf_events(
+        content, deadline, pdf_type=pdf_type, engine=engine or PARSE_ENGINE,
+        backend=PDF_BACKEND, timings=timings
+    )
+    try:
+        # Detection errors are reported as a normal 400 before streaming starts
+        header = await run_in_threadpool(next, pages)
+    except Exception as e:
+        pages.close()
+        parse_pool.release()
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid PDF format", "details": str(e)}
+        )
+    
+    def ndjson_lines() -> Iterator[bytes]:
+        count = 0
+        # Ids and duplicate collapsing continue across pages as if the
+        # document were parsed whole. Venues are never merged: an event
+        # already sent cannot gain venues from a later page
+        index = EventIndex()
+        try:
+            yield orjson.dumps(header) + b"\n"
+            for page in pages:
+                with timings.time('process_events'):
+                    processed = process_events(page['events'], index)
+                with timings.time('serialize'):
+                    events = [event.to_dict() for event in processed]
+                count += len(events)
+                yield orjson.dumps({"page": page['page'], "events": events}) + b"\n"
+            yield orjson.dumps({"done": True, "count": count}) + b"\n"
+            observe_parse(timings, header['type'], header['pages'], count)
+        except Exception as e:
+            yield orjson.dumps({"error": "Parsing failed", "details": str(e)}) + b"\n"
+        finally:
+            pages.close()
+            parse_pool.release()
+            _parse_request_done()
+    
+    # Starlette iterates the synchronous generator in its threadpool
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    pdf_type: Optional[PDFTypeField] = Form(None, alias="type"),
+    engine: Optional[EngineField] = Form(None),
+    merge_venues: bool = Form(False),
+) -> ORJSONResponse:
+    """
+    Queue a PDF for parsing and return at once.
+    
+    The job is parsed by whichever worker claims it first, within
+    JOBS_PARSE_TIMEOUT; poll GET /jobs/{id} (the Location header) for its
+    progress and result.
+    
+    Args:
+        file: PDF file upload
+        pdf_type: Optional `type` form field, as for /parse
+        engine: Optional `engine` form field, as for /parse
+        merge_venues: Optional `merge_venues` form field, as for /parse
+        
+    Returns:
+        The queued job (see GET /jobs/{id}), with status 202
+        
+    Raises:
+        HTTPException: 400 for a non-PDF or empty upload, 413 for
+            oversized uploads, 503 with Retry-After if JOBS_MAX_QUEUED jobs
+            are already waiting
+    """
+    _validate_upload(file)
+    content, digest = await _read_pdf_upload(file)
+    options = {"type": pdf_type, "engine": engine, "mergeVenues": merge_venues}
+    try:
+        job = await run_in_threadpool(job_queue.submit, content, digest, options)
+    except JobQueueFullException as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "Server busy", "details": str(e)},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    if _jobs_wakeup is not None:
+        _jobs_wakeup.set()
+    return ORJSONResponse(job, status_code=202, headers={"Location": f"/jobs/{job['id']}"})
+
+
+@app.get("/jobs/stats")
+def jobs_stats() -> Dict[str, int]:
+    """
+    Job counts on this machine.
+    
+    Returns:
+        JSON object with the number of queued, running, done and failed
+        jobs not yet expired
+    """
+    return job_queue.stats()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    """
+    A job's status, progress and, once done, result.
+    
+    Returns:
+        JSON object with id, status ('queued', 'running', 'done' or
+        'failed'), createdAt, startedAt, finishedAt and expiresAt (Unix
+        times or null) and attempts. Queued jobs add their position in the
+        queue (0 is next), running jobs their progress (pagesDone of
+        pages) once the page count is known, done jobs their result (as
+        /parse returns it) and failed jobs their error (statusCode, error
+        and details, as /parse would have answered)
+        
+    Raises:
+        HTTPException: 404 for unknown job ids and jobs past expiresAt
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "Job not found", "details": f"No job {job_id}, or it has expired"}
+        )
+    return job
+
+
+async def _drain_jobs() -> None:
+    """
+    Claims queued jobs and runs them, up to JOBS_CONCURRENCY at a time.
+    
+    Wakes when this worker queues a job or finishes one, and every
+    JOBS_POLL_INTERVAL seconds for jobs queued through other workers;
+    expired jobs are deleted every JOBS_PURGE_INTERVAL seconds. Jobs are
+    only claimed for idle parse processes, so /parse requests keep the
+    pool's queue and a busy pool leaves the jobs to other workers.
+    """
+    purged = 0.0
+    while True:
+        _jobs_wakeup.clear()
+        try:
+            if time.monotonic() - purged >= JOBS_PURGE_INTERVAL:
+                await run_in_threadpool(job_queue.purge)
+                purged = time.monotonic()
+            # Counted once: jobs claimed in this pass are not admitted to
+            # the pool yet
+            slots = min(JOBS_CONCURRENCY - len(_jobs_running), parse_pool.idle)
+            for _ in range(slots):
+                job = await run_in_threadpool(job_queue.claim, JOBS_LEASE)
+                if job is None:
+                    break
+                task = asyncio.create_task(_run_job(job))
+                _jobs_running[job["id"]] = (job["claim"], task)
+        except Exception:
+            # The database is busy or unavailable; try again next poll
+            pass
+        try:
+            await asyncio.wait_for(_jobs_wakeup.wait(), JOBS_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _run_job(job: Dict[str, Any]) -> None:
+    """
+    Parses a claimed job through the cache and the parse pool and stores
+    its result or error.
+    
+    A full parse pool (busy with /parse requests) puts the job back in the
+    queue rather than failing it. The drainer is then not woken: it claims
+    again at its next poll, once the pool may have room.
+    """
+    options = job["options"]
+    saturated = False
+    try:
+        payload, _ = await _parse_content(
+            job["content"], job["digest"], Deadline(JOBS_PARSE_TIMEOUT),
+            options["type"], options["engine"], options["mergeVenues"],
+            progress=JobProgress(job_queue.path, job["id"], job["claim"])
+        )
+        await run_in_threadpool(job_queue.finish, job["id"], job["claim"], payload)
+    except HTTPException as e:
+        await run_in_threadpool(job_queue.fail, job["id"], job["claim"], e.status_code, e.detail)
+    except PoolSaturatedException:
+        saturated = True
+        await run_in_threadpool(job_queue.requeue, job["id"], job["claim"])
     finally:
-        # Clean up temp file
-        if temp_file and os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+        _jobs_running.pop(job["id"], None)
+        if not saturated:
+            _jobs_wakeup.set()
+    _parse_request_done()
 
 
 if __name__ == "__main__":
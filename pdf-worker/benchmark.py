@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Stage-level benchmarks for the parser pipeline.
+
+Times each stage on its own:
+
+    detect          get_pdf_type() on every ../SourceFiles PDF
+    extract         page table extraction of those PDFs (auto engine), per
+                    backend installed
+    parse_lecture   _parse_weekly_schedule() on fixtures/sample_tables.py
+    parse_test      _parse_test_schedule()   tables scaled up to --rows
+    parse_exam      _parse_exam_schedule()   rows each
+    process_events  process_events() on the events of all three
+    serialize       to_dict() and orjson encoding of the processed events
+
+Each stage runs once to warm up, then --repeat timed samples of at least
+0.2s each (fast stages loop within a sample); the best per-run time is
+reported with its throughput, and one further run under tracemalloc gives
+the stage's peak allocation. Results are compared with the committed
+baseline (benchmark_baseline.json): a stage more than --threshold slower
+or allocating more than --threshold more than its baseline is a
+regression. Timings are only comparable on the machine that saved the
+baseline; refresh it with --save when moving machines and when a change
+is meant to move the numbers.
+
+Usage:
+    python benchmark.py [--stage NAME ...] [--rows N] [--repeat N]
+                        [--threshold FRACTION] [--baseline PATH] [--save]
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+sys.path.insert(0, os.path.dirname(__file__))
+
+import orjson
+
+from fixtures.sample_tables import EXAM_TABLE, LECTURE_TABLE, TEST_TABLE
+from parser import PARSER_VERSION, process_events
+from parser.deadline import Deadline
+from parser.document import PDFDocument
+from parser.mupdf import pymupdf
+from parser.pdf_parser import (
+    _iter_page_tables, _parse_exam_schedule, _parse_test_schedule,
+    _parse_weekly_schedule, _select_engine,
+)
+from parser.templates import template_key
+from parser.utils import get_pdf_type
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+
+# Subject codes module numbers are spread over when scaling sample tables
+_SUBJECTS = ('COS', 'WTW', 'STK', 'INF', 'PHY', 'CMY', 'EKN', 'FRK', 'BME', 'MKB')
+
+
+def scale_table(table, rows):
+    """
+    Repeats a sample table's data rows up to `rows` rows.
+
+    Module codes are varied, as in a large faculty PDF, so repeated rows
+    are distinct events, while days, times and dates keep the handful of
+    values real schedules reuse.
+    """
+    header, data = table[0], table[1:]
+    module = header.index('Module')
+    scaled = [header]
+    for i in range(rows):
+        row = list(data[i % len(data)])
+        subject = _SUBJECTS[i // 900 % len(_SUBJECTS)]
+        row[module] = f"{subject} {100 + i % 900}"
+        scaled.append(row)
+    return scaled
+
+
+# Each timed sample loops a stage for at least this long, so scheduler
+# jitter on millisecond stages averages out as it does on slow ones
+_MIN_SAMPLE_SECONDS = 0.2
+
+
+def measure(run, repeat):
+    """
+    Times a stage.
+
+    Returns:
+        Tuple of the best per-run time in seconds over `repeat` samples,
+        and the peak bytes allocated during one run.
+    """
+    run()
+    # As timeit does, so collections of earlier stages' garbage do not
+    # land in this one's samples
+    gc.collect()
+    gc.disable()
+    try:
+        best = _best_time(run, repeat)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _best_time(run, repeat):
+    """Best per-run time over `repeat` samples of _MIN_SAMPLE_SECONDS."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= _MIN_SAMPLE_SECONDS:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def extract_pages(paths, types, backend):
+    """Extracts every page's tables of every PDF, as a parse would."""
+    for path in paths:
+        with PDFDocument.open(path, backend) as document:
+            engine = _select_engine('auto', types[path], backend)
+            template = template_key(types[path], document.metadata)
+            for _ in _iter_page_tables(document, Deadline(60), template, engine):
+                pass
+
+
+def build_stages(rows):
+    """
+    Sets up every stage's input.
+
+    Returns:
+        Dict of stage name to (run function, item count, item unit).
+    """
+    stages = {}
+
+    paths = sorted(glob.glob(os.path.join(HERE, '..', 'SourceFiles', '*.pdf')))
+    if paths:
+        types = {path: get_pdf_type(path) for path in paths}
+        pages = 0
+        for path in paths:
+            with PDFDocument.open(path) as document:
+                pages += document.page_count
+
+        stages['detect'] = (lambda: [get_pdf_type(path) for path in paths], len(paths), 'files')
+        backends = ['pdfplumber'] + (['pymupdf'] if pymupdf is not None else [])
+        for backend in backends:
+            name = 'extract' if backend == 'pdfplumber' else f'extract[{backend}]'
+            stages[name] = (
+                lambda backend=backend: extract_pages(paths, types, backend),
+                pages, 'pages',
+            )
+
+    tables = {
+        'parse_lecture': (_parse_weekly_schedule, scale_table(LECTURE_TABLE, rows)),
+        'parse_test': (_parse_test_schedule, scale_table(TEST_TABLE, rows)),
+        'parse_exam': (_parse_exam_schedule, scale_table(EXAM_TABLE, rows)),
+    }
+    events = []
+    for name, (parse, table) in tables.items():
+        stages[name] = (lambda parse=parse, table=table: parse([table]), rows, 'rows')
+        events.extend(parse([table]))
+
+    stages['process_events'] = (lambda: process_events(events), len(events), 'events')
+
+    processed = process_events(events)
+    stages['serialize'] = (
+        lambda: orjson.dumps({'events': [event.to_dict() for event in processed]}),
+        len(processed), 'events',
+    )
+    return stages
+
+
+def environment():
+    """Describes where the numbers were taken."""
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'parser_version': PARSER_VERSION,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints each stage's change against the baseline.
+
+    Returns:
+        Names of the stages that regressed.
+    """
+    regressed = []
+    for name, result in results.items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            print(f"  {name:<20} no baseline")
+            continue
+        time_change = result['seconds'] / base['seconds'] - 1
+        alloc_change = result['peak_bytes'] / base['peak_bytes'] - 1 if base['peak_bytes'] else 0.0
+        failed = time_change > threshold or alloc_change > threshold
+        mark = '✗' if failed else '✓'
+        print(f"{mark} {name:<20} time {time_change:+7.1%}   alloc {alloc_change:+7.1%}")
+        if failed:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stage', action='append', help="Stage to run (repeatable); default all")
+    parser.add_argument('--rows', type=int, default=5000, help="Rows per scaled sample table")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per stage")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown or growth, as a fraction")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline file to compare with or save to")
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    # pdfminer warns about malformed PDFs on stderr
+    warnings.filterwarnings('ignore')
+
+    stages = build_stages(args.rows)
+    unknown = set(args.stage or []) - set(stages)
+    if unknown:
+        print(f"Unknown stages: {', '.join(sorted(unknown))}. Available: {', '.join(stages)}")
+        return 2
+
+    print("=" * 72)
+    print("PARSER STAGE BENCHMARKS")
+    print("=" * 72)
+    print(f"  {'stage':<20} {'items':>12} {'best':>10} {'throughput':>18} {'peak alloc':>12}")
+
+    results = {}
+    for name, (run, items, unit) in stages.items():
+        if args.stage and name not in args.stage:
+            continue
+        seconds, peak = measure(run, args.repeat)
+        results[name] = {'seconds': seconds, 'peak_bytes': peak, 'items': items, 'unit': unit}
+        print(
+            f"  {name:<20} {items:>6} {unit:<5} {seconds * 1000:>8.2f}ms "
+            f"{items / seconds:>10,.0f} {unit}/s {peak / 1024:>9,.0f} KB"
+        )
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # Saving a subset of stages keeps the others' baselines
+        stages_baseline = baseline.get('stages', {}) if args.stage else {}
+        stages_baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'environment': environment(),
+                'rows': args.rows,
+                'stages': stages_baseline,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline saved to {os.path.relpath(args.baseline)}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare with; run with --save to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    print("=" * 72)
+    print(f"COMPARED WITH {os.path.relpath(args.baseline)} (threshold {args.threshold:.0%})")
+    print("=" * 72)
+    if baseline.get('rows') != args.rows:
+        print(f"  note: baseline used --rows {baseline.get('rows')}")
+    base_env = baseline.get('environment', {})
+    if {k: v for k, v in base_env.items() if k != 'parser_version'} != \
+            {k: v for k, v in environment().items() if k != 'parser_version'}:
+        print(f"  note: baseline taken on {base_env}; timings may not compare")
+
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(f"\n✗✗✗ REGRESSED: {', '.join(regressed)} ✗✗✗\n")
+        return 1
+    print("\n✓✓✓ NO REGRESSIONS ✓✓✓\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
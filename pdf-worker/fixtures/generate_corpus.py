@@ -0,0 +1,319 @@
+"""
+Generates synthetic UP schedule PDFs of any size for load testing.
+
+Where generate_fixtures.py writes three hand-written tables, this builds
+lecture, test and exam schedules from a seed: the same arguments always
+give the same rows, so a corpus can be regenerated instead of committed.
+Tables follow the SourceFiles layouts (landscape A4, ruled grid, header
+row repeated on every page, forward-filled Module cells on continuation
+rows) so they exercise the same extraction and parsing paths.
+
+Requires: pip install reportlab
+
+Usage:
+    python fixtures/generate_corpus.py --mode lecture --pages 100 --out big.pdf
+    python fixtures/generate_corpus.py --corpus corpus/ [--seed N]
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+MODES = ('lecture', 'test', 'exam')
+
+# Mode keyword drawn on the first page, as get_pdf_type() expects
+TITLES = {'lecture': 'Lectures', 'test': 'Semester Tests', 'exam': 'Exams'}
+
+HEADERS = {
+    'lecture': ['Module', 'Offered', 'Group', 'Lang', 'Activity', 'Day', 'Time',
+                'Venue', 'Campus', 'Study Prog'],
+    'test': ['Module', 'Test', 'Day', 'Date', 'Time', 'Campus', 'Venue'],
+    'exam': ['Status', 'Module', 'Paper', 'Activity', 'Date', 'Start Time',
+             'Module Campus', 'Exam Campus', 'Venue', 'Exam Comments'],
+}
+
+COLUMN_WIDTHS = {
+    'lecture': [0.8, 0.6, 0.5, 0.5, 0.6, 0.9, 1.1, 1.5, 0.9, 2.6],
+    'test': [0.9, 0.7, 1.0, 1.1, 1.2, 1.1, 3.0],
+    'exam': [0.7, 0.8, 0.5, 0.8, 1.1, 0.9, 0.9, 1.0, 2.0, 1.3],
+}
+
+# Size classes of the --corpus preset, in pages per mode
+SIZE_CLASSES = {'small': 1, 'medium': 10, 'large': 50, 'xlarge': 100}
+
+# Data rows per page at the default densities; lecture and test rows run
+# to several lines each
+ROWS_PER_PAGE = {'lecture': 12, 'test': 10, 'exam': 20}
+
+_SUBJECTS = ('COS', 'WTW', 'STK', 'INF', 'PHY', 'CMY', 'EKN', 'FRK', 'BME', 'MKB',
+             'GGY', 'BOT', 'ZEN', 'MLB', 'EBN', 'IMY')
+_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+_TEST_DAYS = _DAYS + ('Saturday',)
+_VENUES = ('IT 4-1', 'IT 4-4', 'IT 4-5', 'Centenary 6', 'Thuto 1-2', 'EMB 2-150',
+           'Informatorium Blue Lab 1', 'Informatorium Blue Lab 2',
+           'Informatorium Red Lab', 'Informatorium Green Lab',
+           'AE du Toit Auditorium', 'Aula', 'Chancellors 2-3')
+_EXAM_VENUES = ('IT Building CBT Labs\n1,2,3', 'Exam Hall A\nSeats 1-50',
+                'Exam Hall B\nSeats 51-200', 'Sports Hall\nSection C', 'Unfinalised')
+_STUDY_PROGS = ('BSc Computer Science', 'BSc Information and Knowledge Systems',
+                'BIS Multimedia', 'BCom Informatics')
+_TERM_START = date(2025, 2, 10)
+
+
+def module_codes(modules: int, rng: random.Random) -> List[str]:
+    """Draws `modules` distinct module codes."""
+    codes = set()
+    while len(codes) < modules:
+        codes.add(f"{rng.choice(_SUBJECTS)} {rng.randint(100, 799)}")
+    return sorted(codes)
+
+
+def _time_range(rng: random.Random, hours: float = 1) -> str:
+    start = rng.randint(7, 17) * 60 + 30
+    end = start + int(hours * 60) - 10
+    return f"{start // 60:02d}:{start % 60:02d} - {end // 60:02d}:{end % 60:02d}"
+
+
+def _term_date(rng: random.Random, weeks: int, upper: bool = False) -> str:
+    day = _TERM_START + timedelta(days=rng.randint(0, weeks * 7))
+    text = day.strftime('%d %b %Y')
+    return text.upper() if upper else text
+
+
+def lecture_rows(rows: int, modules: List[str], days: int, rng: random.Random) -> List[List[str]]:
+    """
+    Lecture rows, each a module group meeting on 1..`days` days.
+
+    A module's further groups follow its first row with the Module cell
+    left empty, as the real schedules print them.
+    """
+    table = []
+    previous = None
+    for _ in range(rows):
+        module = rng.choice(modules)
+        meetings = sorted(rng.sample(_DAYS, rng.randint(1, min(days, len(_DAYS)))), key=_DAYS.index)
+        table.append([
+            '' if module == previous else module,
+            rng.choice(('S1', 'S2', 'Y')),
+            f"G{rng.randint(1, 9):02d}",
+            rng.choice(('E', 'A', 'E L')),
+            '\n'.join(f"L{i + 1}" for i in range(len(meetings))),
+            '\n'.join(meetings),
+            '\n'.join(_time_range(rng) for _ in meetings),
+            '\n'.join(rng.choice(_VENUES) for _ in meetings),
+            'HATFIELD',
+            rng.choice(_STUDY_PROGS),
+        ])
+        previous = module
+    return table
+
+
+def test_rows(rows: int, modules: List[str], venues: int, rng: random.Random) -> List[List[str]]:
+    """Test rows, each a sitting written across 1..`venues` venues."""
+    table = []
+    for _ in range(rows):
+        written = rng.sample(_VENUES, rng.randint(1, min(venues, len(_VENUES))))
+        table.append([
+            rng.choice(modules),
+            rng.choice(('Test1', 'Test2', 'Test3', 'Sick test')),
+            rng.choice(_TEST_DAYS),
+            _term_date(rng, 16),
+            _time_range(rng, rng.choice((1, 1.5, 2))),
+            'HATFIELD',
+            '\n'.join(written),
+        ])
+    return table
+
+
+def exam_rows(rows: int, modules: List[str], rng: random.Random) -> List[List[str]]:
+    """Exam rows, one paper each; later papers of a module leave it empty."""
+    table = []
+    previous = None
+    for _ in range(rows):
+        module = rng.choice(modules)
+        table.append([
+            'FINAL' if module != previous else '',
+            '' if module == previous else module,
+            str(rng.randint(1, 2)),
+            'Exam\nWritten',
+            _term_date(rng, 40, upper=True),
+            f"{rng.choice((7, 8, 12, 14)):02d}:{rng.choice((0, 30)):02d}",
+            'HATF',
+            'HATFIELD',
+            rng.choice(_EXAM_VENUES),
+            '',
+        ])
+        previous = module
+    return table
+
+
+def build_rows(
+    mode: str,
+    rows: int,
+    modules: int = 200,
+    days: int = 4,
+    venues: int = 5,
+    seed: int = 0,
+) -> List[List[str]]:
+    """
+    Builds a schedule's data rows.
+
+    Args:
+        mode: 'lecture', 'test' or 'exam'.
+        rows: Number of data rows.
+        modules: Distinct module codes to draw from.
+        days: Most days a lecture row meets on (multi-day density).
+        venues: Most venues a test row is written in (multi-venue density).
+        seed: Random seed; equal arguments give equal rows.
+
+    Returns:
+        Rows in HEADERS[mode] column order, without the header.
+    """
+    rng = random.Random(f"{mode}-{seed}")
+    codes = module_codes(modules, rng)
+    if mode == 'lecture':
+        return lecture_rows(rows, codes, days, rng)
+    if mode == 'test':
+        return test_rows(rows, codes, venues, rng)
+    if mode == 'exam':
+        return exam_rows(rows, codes, rng)
+    raise ValueError(f"Unknown mode '{mode}'. Expected one of: {', '.join(MODES)}.")
+
+
+def write_schedule_pdf(
+    path: str,
+    mode: str,
+    pages: int,
+    rows_per_page: int = 0,
+    modules: int = 200,
+    days: int = 4,
+    venues: int = 5,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Writes a synthetic schedule PDF.
+
+    Every page holds one table with the header row repeated. A page whose
+    rows do not fit continues on the next page with the header repeated,
+    so the PDF may run slightly past `pages` pages.
+
+    Args:
+        path: Output file.
+        mode: 'lecture', 'test' or 'exam'.
+        pages: Pages of rows to generate.
+        rows_per_page: Data rows per page; 0 for the mode's ROWS_PER_PAGE.
+        modules, days, venues, seed: As for build_rows().
+
+    Returns:
+        Description of the PDF: its arguments, row count and the number of
+        events the parser yields before duplicates are collapsed.
+    """
+    rows_per_page = rows_per_page or ROWS_PER_PAGE[mode]
+    rows = build_rows(mode, pages * rows_per_page, modules, days, venues, seed)
+
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(
+        path, pagesize=landscape(A4),
+        leftMargin=0.4 * inch, rightMargin=0.4 * inch,
+        topMargin=0.4 * inch, bottomMargin=0.4 * inch,
+        title=f"{TITLES[mode]} (synthetic)", creator='generate_corpus.py',
+        # No timestamp or random document id, so equal seeds give equal bytes
+        invariant=True,
+    )
+    style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('LEADING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+    widths = [width * inch for width in COLUMN_WIDTHS[mode]]
+
+    elements = [Paragraph(TITLES[mode], styles['Heading2'])]
+    for start in range(0, len(rows), rows_per_page):
+        if start:
+            elements.append(PageBreak())
+        table = Table([HEADERS[mode]] + rows[start:start + rows_per_page],
+                      colWidths=widths, repeatRows=1)
+        table.setStyle(style)
+        elements.append(table)
+    doc.build(elements)
+
+    if mode == 'lecture':
+        events = sum(row[5].count('\n') + 1 for row in rows)
+    elif mode == 'test':
+        events = sum(row[6].count('\n') + 1 for row in rows)
+    else:
+        events = len(rows)
+    return {
+        'file': os.path.basename(path), 'mode': mode, 'pages': pages,
+        'rows': len(rows), 'events': events, 'modules': modules,
+        'days': days, 'venues': venues, 'seed': seed,
+    }
+
+
+def generate_corpus(directory: str, seed: int = 0, sizes: Dict[str, int] = SIZE_CLASSES) -> List[Dict[str, Any]]:
+    """
+    Writes one PDF per mode and size class, plus a manifest.json.
+
+    Returns:
+        The manifest: write_schedule_pdf()'s description of each PDF,
+        with its size class.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for size, pages in sizes.items():
+        for mode in MODES:
+            path = os.path.join(directory, f"{mode}-{size}.pdf")
+            entry = write_schedule_pdf(path, mode, pages, seed=seed)
+            entry['size'] = size
+            manifest.append(entry)
+            print(f"Created {path} ({entry['rows']} rows, {entry['events']} events)")
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', metavar='DIR', help="Write every mode at every size class to DIR")
+    parser.add_argument('--sizes', help="Size classes for --corpus, e.g. small=1,large=50")
+    parser.add_argument('--mode', choices=MODES, default='lecture')
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=0, help="Data rows per page (default per mode)")
+    parser.add_argument('--modules', type=int, default=200, help="Distinct module codes")
+    parser.add_argument('--days', type=int, default=4, help="Most days per lecture row")
+    parser.add_argument('--venues', type=int, default=5, help="Most venues per test row")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Output PDF (default <mode>-<pages>p.pdf)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        sizes = SIZE_CLASSES
+        if args.sizes:
+            sizes = {
+                name: int(pages)
+                for name, pages in (item.split('=') for item in args.sizes.split(','))
+            }
+        generate_corpus(args.corpus, args.seed, sizes)
+        return
+
+    path = args.out or f"{args.mode}-{args.pages}p.pdf"
+    entry = write_schedule_pdf(
+        path, args.mode, args.pages, args.rows,
+        args.modules, args.days, args.venues, args.seed,
+    )
+    print(f"Created {path} ({entry['rows']} rows, {entry['events']} events)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Gunicorn settings shared by every deployment; the command line (see the
+# Dockerfile) sets binding and timeouts
+import gc
+import importlib
+import os
+import shutil
+import tempfile
+
+# Every worker and parse pool process writes its metrics here, and
+# /metrics sums the files (see service/metrics.py)
+METRICS_DIR = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'pdf-worker-metrics')
+)
+# Created now, not in on_starting: with preload_app the master imports the
+# app, which opens its metric files, before on_starting runs
+os.makedirs(METRICS_DIR, exist_ok=True)
+
+# Import (and warm up, see when_ready) the app once in the master and fork
+# the workers from it: they start serving at once and share the parser's
+# modules and tables copy-on-write. PRELOAD_APP=0 makes each worker import
+# the app itself, without warming up
+preload_app = os.getenv('PRELOAD_APP', '1') != '0'
+
+# Read from the environment rather than the command line because the app
+# divides the machine's memory between this many workers and their parse
+# pools when deriving its recycling limits (service.process_memory_limit)
+workers = int(os.getenv('MAX_WORKERS', '1'))
+
+
+def on_starting(server):
+    """
+    Clears metrics left by an earlier run before any worker starts, keeping
+    those the master itself has written while importing the app.
+    """
+    own = '_{}.db'.format(os.getpid())
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith(own):
+            path = os.path.join(METRICS_DIR, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+
+def when_ready(server):
+    """
+    Warms up the preloaded app (see WARMUP_DIR in app.py), then moves
+    everything the master has loaded out of the garbage collector's reach
+    before the workers fork, so collections in a worker do not write to
+    (and so copy) the pages it shares with the master.
+    """
+    if server.cfg.preload_app:
+        module = importlib.import_module(server.app.app_uri.split(':')[0])
+        module.warm_up()
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    """Drops an exited worker's in-flight and queue gauges from /metrics."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of /parse with a synthetic corpus.
+
+Uploads the PDFs of a corpus written by fixtures/generate_corpus.py
+(manifest.json lists them with their size class) to /parse with a fixed
+number of requests in flight. Each size class is run as its own phase, so
+its throughput and latency percentiles are not mixed with other sizes':
+
+    size      requests  ok  rejected  errors  req/s  pages/s  p50  p95  p99
+
+Rejected counts 503s from a saturated parse pool; errors counts any other
+non-200 response or failed connection.
+
+By default the app is imported and driven in-process through httpx's ASGI
+transport, with the parse-result cache turned off so every upload is
+parsed (pass --cache to keep it). Pass --url to load a running server
+instead, e.g. one started with
+
+    PARSE_CACHE_DISK_MB=0 PARSE_CACHE_MEMORY_ENTRIES=0 \\
+        uvicorn app:app --port 5001 --workers 2
+
+Usage:
+    python loadtest.py --corpus DIR [--url URL] [--concurrency N]
+                       [--requests N] [--size NAME ...] [--mode MODE ...]
+                       [--form KEY=VALUE ...] [--cache] [--json PATH]
+    python loadtest.py --generate DIR [--sizes small=1,medium=10] [--seed N] ...
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import warnings
+from typing import Any, Dict, List
+sys.path.insert(0, os.path.dirname(__file__))
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_corpus(directory: str) -> List[Dict[str, Any]]:
+    """
+    Reads a corpus manifest with each PDF's bytes.
+
+    Returns:
+        Manifest entries, each with a 'content' key added.
+    """
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    for entry in manifest:
+        with open(os.path.join(directory, entry['file']), 'rb') as f:
+            entry['content'] = f.read()
+    return manifest
+
+
+async def run_phase(
+    client: httpx.AsyncClient,
+    entries: List[Dict[str, Any]],
+    requests: int,
+    concurrency: int,
+    form: Dict[str, str],
+) -> Dict[str, Any]:
+    """
+    Sends `requests` uploads, cycling through `entries`, `concurrency` at a time.
+
+    Returns:
+        Counts, throughput and latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    pages = 0
+    events = 0
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal next_request, pages, events
+        while next_request < requests:
+            entry = entries[next_request % len(entries)]
+            next_request += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    '/parse',
+                    files={'file': (entry['file'], entry['content'], 'application/pdf')},
+                    data=form,
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                response = None
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            statuses[status] = statuses.get(status, 0) + 1
+            if response is not None and response.status_code == 200:
+                latencies.append(elapsed)
+                pages += entry['pages']
+                events += len(response.json().get('events', []))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    ok = statuses.get('200', 0)
+    result = {
+        'requests': requests,
+        'ok': ok,
+        'rejected': statuses.get('503', 0),
+        'errors': requests - ok - statuses.get('503', 0),
+        'statuses': statuses,
+        'seconds': wall,
+        'requests_per_second': ok / wall,
+        'pages_per_second': pages / wall,
+        'events': events,
+    }
+    if latencies:
+        result.update({
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+        })
+    return result
+
+
+def print_result(size: str, result: Dict[str, Any]) -> None:
+    latency = (
+        f"{result['p50_ms']:>8.0f} {result['p95_ms']:>8.0f} {result['p99_ms']:>8.0f}"
+        if 'p50_ms' in result else f"{'-':>8} {'-':>8} {'-':>8}"
+    )
+    print(
+        f"  {size:<8} {result['requests']:>8} {result['ok']:>6} {result['rejected']:>8} "
+        f"{result['errors']:>6} {result['requests_per_second']:>7.2f} "
+        f"{result['pages_per_second']:>8.1f} {latency}"
+    )
+
+
+async def run(args: argparse.Namespace, manifest: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Runs one phase per size class against the app or --url."""
+    app_module = None
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        if not args.cache:
+            os.environ['PARSE_CACHE_DISK_MB'] = '0'
+            os.environ['PARSE_CACHE_MEMORY_ENTRIES'] = '0'
+        import app as app_module
+        transport = httpx.ASGITransport(app=app_module.app)
+        base_url = 'http://loadtest'
+
+    form = dict(item.split('=', 1) for item in args.form or [])
+    sizes: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in manifest:
+        if args.mode and entry['mode'] not in args.mode:
+            continue
+        if args.size and entry['size'] not in args.size:
+            continue
+        sizes.setdefault(entry['size'], []).append(entry)
+
+    print("=" * 80)
+    print(f"LOAD TEST {args.url or 'in-process app'} "
+          f"(concurrency {args.concurrency}, {args.requests} requests per size)")
+    print("=" * 80)
+    print(f"  {'size':<8} {'requests':>8} {'ok':>6} {'rejected':>8} {'errors':>6} "
+          f"{'req/s':>7} {'pages/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=None) as client:
+            for size, entries in sizes.items():
+                results[size] = await run_phase(client, entries, args.requests, args.concurrency, form)
+                print_result(size, results[size])
+    finally:
+        if app_module is not None:
+            # The ASGI transport sends no lifespan events
+            app_module.parse_pool.shutdown()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--corpus', metavar='DIR', help="Corpus written by fixtures/generate_corpus.py")
+    source.add_argument('--generate', metavar='DIR', help="Generate a corpus into DIR first, then load it")
+    parser.add_argument('--sizes', help="Size classes to generate, e.g. small=1,large=50")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the generated corpus")
+    parser.add_argument('--url', help="Load a running server instead of the in-process app")
+    parser.add_argument('--concurrency', type=int, default=4, help="Requests in flight")
+    parser.add_argument('--requests', type=int, default=20, help="Requests per size class")
+    parser.add_argument('--size', action='append', help="Size class to run (repeatable); default all")
+    parser.add_argument('--mode', action='append', help="Schedule mode to upload (repeatable); default all")
+    parser.add_argument('--form', action='append', metavar='KEY=VALUE', help="Extra /parse form field")
+    parser.add_argument('--cache', action='store_true', help="Keep the in-process app's parse cache on")
+    parser.add_argument('--json', metavar='PATH', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    # pdfminer warns about malformed PDFs on stderr
+    warnings.filterwarnings('ignore')
+
+    directory = args.corpus
+    if args.generate:
+        from fixtures.generate_corpus import SIZE_CLASSES, generate_corpus
+        sizes = SIZE_CLASSES
+        if args.sizes:
+            sizes = {
+                name: int(pages)
+                for name, pages in (item.split('=') for item in args.sizes.split(','))
+            }
+        generate_corpus(args.generate, args.seed, sizes)
+        directory = args.generate
+
+    results = asyncio.run(run(args, load_corpus(directory)))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'url': args.url, 'concurrency': args.concurrency,
+                'requests': args.requests, 'sizes': results,
+            }, f, indent=2)
+    failed = any(result['errors'] for result in results.values())
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,16 @@
 # PDF Parser module for UP Schedule Generator
 # Wraps V2 Python parser for use as HTTP microservice
 
-from .pdf_parser import parse_pdf
-from .data_processor import process_events
-from .utils import get_pdf_type
+# Bump whenever parser output changes, so cached results are not reused
+PARSER_VERSION = '3.4.0'
 
-__all__ = ['parse_pdf', 'process_events', 'get_pdf_type']
+from .pdf_parser import parse_pdf, iter_pdf_events
+from .data_processor import EventIndex, process_events
+from .deadline import Deadline, TimeoutException
+from .document import BACKENDS, PDFDocument
+from .events import ScheduleEvent
+from .timing import StageTimings
+from .utils import PDF_TYPES, get_pdf_type, resolve_pdf_type
+
+__all__ = ['parse_pdf', 'iter_pdf_events', 'process_events', 'EventIndex', 'get_pdf_type', 'resolve_pdf_type',
+           'PDF_TYPES', 'PDFDocument', 'BACKENDS', 'ScheduleEvent', 'StageTimings', 'Deadline', 'TimeoutException', 'PARSER_VERSION']
@@ -1,71 +1,235 @@
-from typing import List, Dict, Any
+import hashlib
 import re
+import uuid
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+from .events import ScheduleEvent
 
-def process_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Time ranges (HH:MM-HH:MM) of lectures and tests, and the single start time
+# of exams
+_TIME_RANGE_PATTERN = re.compile(r'(\d{2}:\d{2})\s*-\s*(\d{2}:\d{2})')
+_START_TIME_PATTERN = re.compile(r'(\d{2}):(\d{2})')
+
+# Test and exam dates, e.g. "23 Aug 2025" or "12 NOV 2025"
+_DATE_PATTERN = re.compile(r'(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{4})')
+
+_MONTHS = {
+    name: number for number, name in enumerate(
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+         'jul', 'aug', 'sep', 'oct', 'nov', 'dec'),
+        start=1,
+    )
+}
+
+# Exams only give a start time; they are assumed to last this long
+_EXAM_DURATION_HOURS = 3
+
+# uuid5 namespace of event ids; changing it changes every id
+EVENT_ID_NAMESPACE = uuid.UUID('56e83a95-c04d-48e9-ac5b-150229f12147')
+
+# Distinct Time/Date/Day cells remembered per process. A schedule reuses a
+# handful of slots, so nearly every event after the first few is a hit
+_MEMO_SIZE = 4096
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _parse_time(time: str) -> Optional[Tuple[str, str]]:
+    """
+    Parses a Time cell into start and end times.
+
+    Returns:
+        (start, end) in HH:MM, or None if the cell holds no time. A single
+        time (exams) ends _EXAM_DURATION_HOURS later.
+    """
+    time_match = _TIME_RANGE_PATTERN.search(time)
+    if time_match:
+        return time_match.group(1), time_match.group(2)
+
+    start_match = _START_TIME_PATTERN.search(time)
+    if start_match:
+        hour, minute = start_match.groups()
+        end_hour = (int(hour) + _EXAM_DURATION_HOURS) % 24
+        return f"{hour}:{minute}", f"{end_hour:02d}:{minute}"
+    return None
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _iso_date(value: str) -> str:
+    """
+    Converts a Date cell like "23 Aug 2025" to an ISO date ("2025-08-23").
+
+    Cells that are not a valid date (e.g. "TBA") are returned unchanged.
+    """
+    date_match = _DATE_PATTERN.fullmatch(value.strip())
+    if date_match:
+        day, month, year = date_match.groups()
+        month_number = _MONTHS.get(month.lower())
+        if month_number is not None:
+            try:
+                return date(int(year), month_number, int(day)).isoformat()
+            except ValueError:
+                pass
+    return value
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _day_name(day: str) -> str:
+    """Standardises a day name, e.g. " MONDAY" to "Monday"."""
+    return day.strip().capitalize()
+
+
+def _event_id(event: ScheduleEvent, index: 'EventIndex') -> str:
+    """
+    Derives an event's stable id from what identifies it in the schedule.
+
+    The identity is the module, activity, group and semester, plus the day
+    for weekly events. Times, venues and dates are left out, so an event
+    that moves keeps its id and shows up as changed. Later events sharing
+    the first one's identity (e.g. one test written in several venues) add
+    their date, start time and venue, rather than their position, so an
+    event inserted before them does not shift their ids; only events equal
+    in those too are numbered in document order.
+    """
+    identity = '\x1f'.join(value or '' for value in (
+        event.module, event.activity, event.group, event.semester,
+        event.day if event.is_recurring else None,
+    ))
+    if index.next_occurrence(identity) == 0:
+        name = f"{identity}\x1f0"
+    else:
+        tie = '\x1f'.join(value or '' for value in (
+            identity, event.date, event.start_time, event.venue,
+        ))
+        name = f"{tie}\x1f{index.next_occurrence(tie)}"
+    return str(uuid.uuid5(EVENT_ID_NAMESPACE, name))
+
+
+def _fingerprint(event: ScheduleEvent) -> str:
+    """Hashes every normalised field of an event, to tell when it changed."""
+    content = '\x1f'.join(value or '' for value in (
+        event.module, event.activity, event.group, event.day, event.date,
+        event.start_time, event.end_time, event.venue, event.semester,
+        'R' if event.is_recurring else None,
+    ))
+    return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+
+
+class EventIndex:
+    """
+    Hash index of the events already processed for one document.
+
+    Events repeating one already indexed in every field -- from rows
+    repeated in "-Both" PDFs or across a page break -- are collapsed into
+    it. With merge_venues, events that differ only in venue (a practical
+    held in several labs at once, a test written in several venues) are
+    merged as well: the first keeps all venues in `venues`, joined in
+    `venue`. Each event is looked up once, so collapsing is linear in the
+    number of events.
+
+    The index also numbers events sharing an identity for their stable
+    ids. One index is shared by every page of a document, so ids and
+    duplicates carry across page breaks.
+    """
+
+    __slots__ = ('merge_venues', '_events', '_occurrences')
+
+    def __init__(self, merge_venues: bool = False):
+        self.merge_venues = merge_venues
+        self._events: Dict[Tuple[Any, ...], ScheduleEvent] = {}
+        self._occurrences: Dict[str, int] = {}
+
+    def collapse(self, event: ScheduleEvent) -> bool:
+        """
+        Indexes a normalised event, unless it repeats an indexed one.
+
+        Returns:
+            True if the event was collapsed into an earlier event (and
+            should be dropped), False if it is new.
+        """
+        key = (
+            event.module, event.activity, event.group, event.day, event.date,
+            event.start_time, event.end_time, event.semester,
+            event.is_recurring,
+        )
+        if not self.merge_venues:
+            key += (event.venue,)
+
+        first = self._events.get(key)
+        if first is None:
+            self._events[key] = event
+            return False
+
+        if self.merge_venues and event.venue not in (first.venues or (first.venue,)):
+            if first.venues is None:
+                first.venues = [first.venue]
+            first.venues.append(event.venue)
+            first.venue = ', '.join(first.venues)
+            first.fingerprint = _fingerprint(first)
+        return True
+
+    def next_occurrence(self, identity: str) -> int:
+        """Numbers the events sharing an id identity (or tie) in document order."""
+        occurrence = self._occurrences.get(identity, 0)
+        self._occurrences[identity] = occurrence + 1
+        return occurrence
+
+
+def process_events(
+    events: List[ScheduleEvent],
+    index: Optional[EventIndex] = None,
+) -> List[ScheduleEvent]:
     """
     Cleans and validates a list of parsed schedule events.
     Handles all three modes: lecture, test, exam.
 
-    This function standardizes data formats (e.g., day names, times)
-    and prepares the event data for calendar generation.
+    Day names are standardised, Time cells become start and end times,
+    dates become ISO dates, duplicates are collapsed, and isRecurring, the
+    stable id and the content fingerprint are set, in a single pass. Time,
+    Date and Day cells are parsed once per distinct value. The input
+    events are left untouched.
 
     Args:
-        events: A list of event dictionaries from the PDF parser.
+        events: A list of events from the PDF parser.
+        index: The document's EventIndex. Updated in place, so ids and
+            duplicate collapsing continue across calls when a document's
+            events are processed page by page. Defaults to a new index
+            that only collapses exact duplicates.
 
     Returns:
-        A list of cleaned and validated event dictionaries.
+        New, cleaned events; events whose Time cell holds no time, and
+        duplicates, are dropped. With index.merge_venues, an event may
+        still gain venues from later calls.
     """
+    if index is None:
+        index = EventIndex()
+
     processed_events = []
     for event in events:
-        # 1. Standardize Day Names (for lectures only)
-        if 'Day' in event and event['Day']:
-            event['Day'] = event['Day'].strip().capitalize()
-
-        # 2. Validate and Clean Time Format
-        if 'Time' in event and event['Time']:
-            # Try to match time range format (HH:MM-HH:MM) for lectures and tests
-            time_match = re.search(r'(\d{2}:\d{2})\s*-\s*(\d{2}:\d{2})', event['Time'])
-            if time_match:
-                event['start_time'] = time_match.group(1)
-                event['end_time'] = time_match.group(2)
-            else:
-                # Try to match single time format (HH:MM) for exams
-                single_time_match = re.search(r'(\d{2}:\d{2})', event['Time'])
-                if single_time_match:
-                    event['start_time'] = single_time_match.group(1)
-                    # For exams, default to 3 hours duration
-                    start_hour, start_min = map(int, event['start_time'].split(':'))
-                    end_hour = (start_hour + 3) % 24
-                    event['end_time'] = f"{end_hour:02d}:{start_min:02d}"
-                else:
-                    # Skip events with invalid times
-                    continue
-
-        # 3. Create event summary based on type
-        # Determine event type by checking which fields are present
-        if 'Module' in event and 'Test' in event:
-            # Test event
-            event['summary'] = f"{event['Module']} {event['Test']}"
-            event['isRecurring'] = False
-        elif 'Module' in event and 'Activity' in event:
-            # Could be lecture or exam - check for Day field to distinguish
-            if 'Day' in event and event['Day']:
-                # Lecture event (has Day field)
-                event['summary'] = f"{event['Module']} {event['Activity']}"
-                event['isRecurring'] = True
-            else:
-                # Exam event (has Date field instead of Day)
-                event['summary'] = f"{event['Module']} {event['Activity']}"
-                event['isRecurring'] = False
-        else:
-            event['summary'] = "Unnamed Event"
-            event['isRecurring'] = False
-
-        # 4. Add location information from venue
-        if 'Venue' in event:
-            event['location'] = event['Venue']
-
-        processed_events.append(event)
+        processed = event.copy()
+
+        if event.time:
+            times = _parse_time(event.time)
+            if times is None:
+                # Skip events with invalid times
+                continue
+            processed.start_time, processed.end_time = times
+
+        if event.day:
+            processed.day = _day_name(event.day)
+        if event.date:
+            processed.date = _iso_date(event.date)
+
+        # Weekly lectures have a day but no date; tests and exams happen
+        # once, on their date
+        processed.is_recurring = event.day is not None and event.date is None
+
+        if index.collapse(processed):
+            continue
+
+        processed.id = _event_id(processed, index)
+        processed.fingerprint = _fingerprint(processed)
+        processed_events.append(processed)
 
     return processed_events
@@ -0,0 +1,45 @@
+import time
+from typing import Optional
+
+
+class TimeoutException(Exception):
+    """Raised when PDF processing exceeds timeout"""
+    pass
+
+
+class Deadline:
+    """
+    A point in time by which parsing must finish.
+
+    Unlike a SIGALRM-based timeout this works in any thread and survives
+    being pickled into a worker process: the parser calls check() between
+    pages and tables and stops cooperatively once the deadline has passed.
+    Work stuck inside a single call (e.g. one pathological page) is not
+    interrupted; callers running parses in a process pool enforce that
+    case by killing the process.
+
+    The expiry is an absolute time.monotonic() value, which on Linux is
+    shared by every process on the machine.
+    """
+
+    def __init__(self, seconds: float, expires_at: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (negative once expired)."""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        """
+        Stops the caller if the deadline has passed.
+
+        Raises:
+            TimeoutException: If the deadline has passed
+        """
+        if self.expired():
+            raise TimeoutException(f"Operation timed out after {self.seconds:g} seconds")
@@ -0,0 +1,216 @@
+import io
+import os
+from abc import ABC, abstractmethod
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+from typing import Any, BinaryIO, Dict, Hashable, List, Optional, Union
+from .templates import extract_page_tables
+from .words import extract_word_tables
+
+# PDF libraries a document can be opened with. pdfplumber (pure Python, on
+# pdfminer) is the reference; pymupdf is the optional native backend
+BACKENDS = ('pdfplumber', 'pymupdf')
+
+# Anything a PDF can be opened from: a path, the raw bytes, or a binary
+# file-like object (e.g. an upload's spooled buffer)
+PDFSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def _open_stream(source: PDFSource) -> Union[str, os.PathLike, BinaryIO]:
+    """Adapts a PDFSource to what pdfplumber.open() accepts."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def picklable_source(source: PDFSource) -> Union[str, os.PathLike, bytes]:
+    """
+    Converts a PDFSource into a form that can be sent to another process.
+
+    Paths and bytes are returned as-is; buffers and file-like objects are
+    read into bytes (file objects are rewound first).
+
+    Args:
+        source: The PDF source.
+
+    Returns:
+        A path or the PDF's bytes.
+    """
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+class PDFDocument(ABC):
+    """
+    A single open schedule PDF shared by every stage of a parse.
+
+    Opening a PDF parses its xref table, fonts and page tree. Type detection,
+    the page-limit check and table extraction all work from the same
+    PDFDocument so that this work (and the layout of page 1, which both
+    detection and extraction need) happens once per request.
+
+    This is the interface every PDF backend implements; open() picks the
+    implementation. Use as a context manager, or call close() when done.
+    """
+
+    @classmethod
+    def open(cls, source: PDFSource, backend: str = 'pdfplumber') -> 'PDFDocument':
+        """
+        Opens a PDF for parsing.
+
+        Args:
+            source: The absolute path to the PDF file, its bytes, or a
+                seekable binary file object. Bytes and buffers are parsed
+                in memory without touching disk.
+            backend: PDF library to read it with, one of BACKENDS.
+
+        Returns:
+            An open PDFDocument.
+
+        Raises:
+            ValueError: If the backend is unknown or not installed
+        """
+        if backend == 'pdfplumber':
+            return PlumberDocument(pdfplumber.open(_open_stream(source)))
+        if backend == 'pymupdf':
+            # Imported on demand; the package is optional
+            from .mupdf import MuPDFDocument
+            return MuPDFDocument.from_source(source)
+        raise ValueError(
+            f"Unknown PDF backend '{backend}'. Expected one of: {', '.join(BACKENDS)}."
+        )
+
+    @property
+    @abstractmethod
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+
+    @property
+    @abstractmethod
+    def metadata(self) -> Dict[str, Any]:
+        """The document's info dictionary (Producer, Creator, ...)."""
+
+    @abstractmethod
+    def page_text(self, index: int) -> Optional[str]:
+        """
+        Extracts the text of a single page.
+
+        Args:
+            index: Zero-based page index.
+
+        Returns:
+            The page text, or None if the page has no text layer.
+        """
+
+    @abstractmethod
+    def page_content(self, index: int) -> bytes:
+        """
+        Returns a page's raw, decompressed content stream.
+
+        No layout analysis is done, so this is orders of magnitude cheaper
+        than page_text() for a quick look at the operators on a page.
+
+        Args:
+            index: Zero-based page index.
+
+        Returns:
+            The page's content streams, concatenated.
+        """
+
+    @abstractmethod
+    def page_tables(
+        self,
+        index: int,
+        template: Optional[Hashable] = None,
+        engine: str = 'tables',
+    ) -> List[List[List[str]]]:
+        """
+        Extracts every table on a single page.
+
+        Args:
+            index: Zero-based page index.
+            template: templates.template_key() of the document; pages
+                matching the layout learned for it skip generic table
+                detection. None always detects generically.
+            engine: 'tables' for pdfplumber's table reconstruction, or
+                'words' to bin words into the page's ruled grid (see
+                words.extract_word_tables). Pages the word engine cannot
+                read fall back to 'tables'.
+
+        Returns:
+            List of tables, each a list of rows of cell strings.
+        """
+
+    @abstractmethod
+    def release_page(self, index: int) -> None:
+        """
+        Drops whatever the backend has cached for a page.
+
+        Releasing pages once they are extracted keeps memory flat
+        regardless of page count.
+
+        Args:
+            index: Zero-based page index.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Releases the underlying file handle and parser state."""
+
+    def __enter__(self) -> 'PDFDocument':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class PlumberDocument(PDFDocument):
+    """PDFDocument backed by pdfplumber (and pdfminer underneath)."""
+
+    def __init__(self, pdf: pdfplumber.PDF):
+        self._pdf = pdf
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pdf.pages)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._pdf.metadata
+
+    @property
+    def pages(self) -> List[pdfplumber.page.Page]:
+        """The document's pdfplumber pages, in order."""
+        return self._pdf.pages
+
+    def page_text(self, index: int) -> Optional[str]:
+        return self._pdf.pages[index].extract_text()
+
+    def page_content(self, index: int) -> bytes:
+        streams = self._pdf.pages[index].page_obj.contents or []
+        return b'\n'.join(resolve1(stream).get_data() for stream in streams)
+
+    def page_tables(
+        self,
+        index: int,
+        template: Optional[Hashable] = None,
+        engine: str = 'tables',
+    ) -> List[List[List[str]]]:
+        page = self._pdf.pages[index]
+        if engine == 'words':
+            tables = extract_word_tables(page)
+            if tables is not None:
+                return tables
+        return extract_page_tables(page, template)
+
+    def release_page(self, index: int) -> None:
+        # pdfplumber keeps every parsed object of a page (chars, lines,
+        # rects) alive for as long as the document is open
+        self._pdf.pages[index].close()
+
+    def close(self) -> None:
+        self._pdf.close()
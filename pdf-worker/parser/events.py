@@ -0,0 +1,114 @@
+import sys
+from typing import Any, Dict, List, Optional
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Interns a repeated cell string so every event shares one copy."""
+    return sys.intern(value) if value else value
+
+
+class ScheduleEvent:
+    """
+    One class session, test or exam sitting parsed from a schedule.
+
+    Holds only the fields of the backend's ParsedEvent rather than every
+    PDF column. Module, activity, group, day, venue and semester repeat
+    across a schedule's rows and are interned, so events share one copy of
+    each. Parsers fill the raw fields, including the Time cell as printed;
+    process_events() then sets start_time, end_time and is_recurring, and
+    the stable id and content fingerprint.
+    """
+
+    __slots__ = (
+        'module', 'activity', 'group', 'day', 'date', 'time', 'venue',
+        'semester', 'start_time', 'end_time', 'is_recurring', 'id',
+        'fingerprint', 'venues',
+    )
+
+    def __init__(
+        self,
+        module: str,
+        activity: str,
+        time: str,
+        venue: str,
+        group: Optional[str] = None,
+        day: Optional[str] = None,
+        date: Optional[str] = None,
+        semester: Optional[str] = None,
+    ):
+        self.module = _intern(module)
+        self.activity = _intern(activity)
+        # Empty optional cells are left out, as the backend expects
+        self.group = _intern(group or None)
+        self.day = _intern(day or None)
+        self.date = date or None
+        self.time = time
+        self.venue = _intern(venue)
+        self.semester = _intern(semester or None)
+        self.start_time = ''
+        self.end_time = ''
+        self.is_recurring = False
+        self.id: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        # Every venue of an event merged from simultaneous ones, else None
+        self.venues: Optional[List[str]] = None
+
+    def copy(self) -> 'ScheduleEvent':
+        """Returns a shallow copy of the event."""
+        event = ScheduleEvent.__new__(ScheduleEvent)
+        event.module = self.module
+        event.activity = self.activity
+        event.group = self.group
+        event.day = self.day
+        event.date = self.date
+        event.time = self.time
+        event.venue = self.venue
+        event.semester = self.semester
+        event.start_time = self.start_time
+        event.end_time = self.end_time
+        event.is_recurring = self.is_recurring
+        event.id = self.id
+        event.fingerprint = self.fingerprint
+        event.venues = self.venues
+        return event
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ScheduleEvent):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"ScheduleEvent({self.module!r}, {self.activity!r}, {self.day or self.date!r}, {self.time!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialises the event in the backend's ParsedEvent shape.
+
+        Returns:
+            Dictionary with module, activity, startTime, endTime, venue and
+            isRecurring, plus group, day, date, semester and venues when
+            set, and id and fingerprint once process_events() has assigned
+            them.
+        """
+        event: Dict[str, Any] = {}
+        if self.id is not None:
+            event['id'] = self.id
+        event['module'] = self.module
+        event['activity'] = self.activity
+        if self.group is not None:
+            event['group'] = self.group
+        if self.day is not None:
+            event['day'] = self.day
+        if self.date is not None:
+            event['date'] = self.date
+        event['startTime'] = self.start_time
+        event['endTime'] = self.end_time
+        event['venue'] = self.venue
+        if self.venues is not None:
+            event['venues'] = list(self.venues)
+        if self.semester is not None:
+            event['semester'] = self.semester
+        event['isRecurring'] = self.is_recurring
+        if self.fingerprint is not None:
+            event['fingerprint'] = self.fingerprint
+        return event
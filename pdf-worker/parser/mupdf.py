@@ -0,0 +1,185 @@
+import os
+from bisect import bisect_right
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+from .document import PDFDocument, PDFSource, picklable_source
+from .words import grid_table, rule_grid
+
+try:
+    import pymupdf
+except ImportError:
+    # Optional backend; PDFDocument.open() reports it when selected
+    pymupdf = None
+
+# Words may overhang their cell's rules by this much; text running further
+# into the next column is split per character by pdfplumber, which word
+# boxes cannot reproduce
+_OVERHANG_TOLERANCE = 1
+
+# pymupdf's lower-case metadata keys, as PDF info dictionary names
+_METADATA_KEYS = {
+    'title': 'Title',
+    'author': 'Author',
+    'subject': 'Subject',
+    'keywords': 'Keywords',
+    'creator': 'Creator',
+    'producer': 'Producer',
+    'creationDate': 'CreationDate',
+    'modDate': 'ModDate',
+}
+
+
+class MuPDFDocument(PDFDocument):
+    """
+    PDFDocument backed by MuPDF (the pymupdf package).
+
+    MuPDF decodes text and drawings in C, where pdfminer spends most of a
+    parse decoding text in Python. The word engine's ruled-grid extraction
+    runs natively on MuPDF words and drawings. Anything else -- the
+    'tables' engine, pages that are not one full grid, and text that
+    overruns a column -- is delegated page by page to a pdfplumber
+    document opened on first need, so results match the pdfplumber
+    backend exactly.
+    """
+
+    def __init__(self, document: Any, source: Union[str, os.PathLike, bytes]):
+        self._document = document
+        self._source = source
+        self._fallback: Optional[PDFDocument] = None
+
+    @classmethod
+    def from_source(cls, source: PDFSource) -> 'MuPDFDocument':
+        """
+        Opens a PDF with MuPDF.
+
+        Args:
+            source: The absolute path to the PDF file, its bytes, or a
+                seekable binary file object.
+
+        Returns:
+            An open MuPDFDocument.
+
+        Raises:
+            ValueError: If pymupdf is not installed
+        """
+        if pymupdf is None:
+            raise ValueError("PDF backend 'pymupdf' requires the pymupdf package")
+
+        # File objects are read once so the fallback can reopen the bytes
+        source = picklable_source(source)
+        if isinstance(source, bytes):
+            document = pymupdf.open(stream=source, filetype='pdf')
+        else:
+            document = pymupdf.open(source)
+        return cls(document, source)
+
+    @property
+    def page_count(self) -> int:
+        return self._document.page_count
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            _METADATA_KEYS.get(key, key): value
+            for key, value in (self._document.metadata or {}).items()
+            if value
+        }
+
+    def page_text(self, index: int) -> Optional[str]:
+        return self._document[index].get_text(flags=pymupdf.TEXT_MEDIABOX_CLIP) or None
+
+    def page_content(self, index: int) -> bytes:
+        return self._document[index].read_contents()
+
+    def page_tables(
+        self,
+        index: int,
+        template: Optional[Hashable] = None,
+        engine: str = 'tables',
+    ) -> List[List[List[str]]]:
+        if engine == 'words':
+            tables = self._grid_tables(index)
+            if tables is not None:
+                return tables
+        return self._plumber().page_tables(index, template, engine)
+
+    def release_page(self, index: int) -> None:
+        # MuPDF pages are loaded per call and not kept
+        if self._fallback is not None:
+            self._fallback.release_page(index)
+
+    def close(self) -> None:
+        self._document.close()
+        if self._fallback is not None:
+            self._fallback.close()
+
+    def _plumber(self) -> PDFDocument:
+        """The pdfplumber document pages are delegated to."""
+        if self._fallback is None:
+            self._fallback = PDFDocument.open(self._source, 'pdfplumber')
+        return self._fallback
+
+    def _grid_tables(self, index: int) -> Optional[List[List[List[str]]]]:
+        """
+        Reads a page's ruled grid from MuPDF's drawings and words.
+
+        Returns:
+            A single-table list, or None if the page is not one full grid
+            or a word overruns its column.
+        """
+        page = self._document[index]
+        grid = rule_grid(_drawing_edges(page.get_drawings()))
+        if grid is None:
+            return None
+        xs, ys = grid
+
+        words = []
+        # Ligatures are expanded, as pdfplumber does by default
+        for x0, top, x1, bottom, text, *_ in page.get_text('words', flags=pymupdf.TEXT_MEDIABOX_CLIP):
+            h_mid = (x0 + x1) / 2
+            v_mid = (top + bottom) / 2
+            c = bisect_right(xs, h_mid) - 1
+            in_grid = 0 <= c < len(xs) - 1 and h_mid < xs[-1] and ys[0] <= v_mid < ys[-1]
+            if in_grid and (x0 < xs[c] - _OVERHANG_TOLERANCE or x1 > xs[c + 1] + _OVERHANG_TOLERANCE):
+                return None
+            words.append({
+                'x0': x0, 'x1': x1, 'top': top, 'bottom': bottom,
+                'doctop': top, 'text': text,
+            })
+
+        # pdfplumber orders the words of a line left to right
+        words.sort(key=lambda word: word['x0'])
+        return [grid_table(words, xs, ys)]
+
+
+def _drawing_edges(drawings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Converts MuPDF drawings into pdfplumber-style edges.
+
+    Rectangles contribute their four sides and straight lines themselves,
+    as pdfplumber's Page.edges does; curves are ignored.
+    """
+    edges = []
+    for drawing in drawings:
+        for item in drawing['items']:
+            if item[0] == 're':
+                rect = item[1]
+                edges.append(_edge('h', rect.x0, rect.x1, rect.y0, rect.y0))
+                edges.append(_edge('h', rect.x0, rect.x1, rect.y1, rect.y1))
+                edges.append(_edge('v', rect.x0, rect.x0, rect.y0, rect.y1))
+                edges.append(_edge('v', rect.x1, rect.x1, rect.y0, rect.y1))
+            elif item[0] == 'l':
+                start, end = item[1], item[2]
+                if start.y == end.y:
+                    edges.append(_edge('h', min(start.x, end.x), max(start.x, end.x), start.y, start.y))
+                elif start.x == end.x:
+                    edges.append(_edge('v', start.x, start.x, min(start.y, end.y), max(start.y, end.y)))
+    return edges
+
+
+def _edge(orientation: str, x0: float, x1: float, top: float, bottom: float) -> Dict[str, Any]:
+    return {
+        'orientation': orientation,
+        'x0': x0, 'x1': x1, 'top': top, 'bottom': bottom,
+        'width': x1 - x0, 'height': bottom - top,
+    }
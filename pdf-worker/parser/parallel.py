@@ -0,0 +1,149 @@
+import ctypes
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+from .deadline import Deadline, TimeoutException
+from .document import PDFDocument, PDFSource, picklable_source
+
+# Below this many pages, opening the PDF again in every extraction process
+# costs more than extracting the pages serially
+PARALLEL_MIN_PAGES = 20
+
+# prctl() option asking the kernel to signal a process when its parent dies
+_PR_SET_PDEATHSIG = 1
+
+
+def _die_with_parent(parent: int) -> None:
+    """
+    Makes an extraction process exit when the process that started it does.
+
+    The parse pool kills a stuck parse process outright, without running
+    its cleanup; its extraction processes would otherwise keep running as
+    orphans. Linux only; elsewhere they stop at their next deadline check.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.prctl(_PR_SET_PDEATHSIG, signal.SIGKILL)
+    except (OSError, AttributeError):
+        return
+    if os.getppid() != parent:
+        # The parent died before the signal was asked for
+        os._exit(1)
+
+
+def _extract_page_range(
+    source: PDFSource,
+    start: int,
+    stop: int,
+    deadline: Optional[Deadline],
+    template: Optional[Hashable] = None,
+    engine: str = 'tables',
+    backend: str = 'pdfplumber',
+) -> List[List[List[List[str]]]]:
+    """
+    Extracts the tables of pages [start, stop) in a separate process.
+
+    Each process opens its own copy of the document; pdfplumber objects
+    cannot be shared across processes.
+
+    Returns:
+        One list of tables per page, in page order.
+    """
+    page_tables = []
+    with PDFDocument.open(source, backend) as document:
+        for index in range(start, stop):
+            if deadline is not None:
+                deadline.check()
+            page_tables.append(document.page_tables(index, template, engine))
+            document.release_page(index)
+    return page_tables
+
+
+def _page_ranges(first: int, stop: int, parts: int) -> List[Tuple[int, int]]:
+    """Splits pages [first, stop) into at most `parts` contiguous ranges."""
+    count = stop - first
+    parts = max(1, min(parts, count))
+    size, extra = divmod(count, parts)
+    ranges = []
+    start = first
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def iter_page_tables_parallel(
+    source: PDFSource,
+    document: PDFDocument,
+    workers: int,
+    deadline: Optional[Deadline] = None,
+    template: Optional[Hashable] = None,
+    engine: str = 'tables',
+    backend: str = 'pdfplumber',
+) -> Iterator[List[List[List[str]]]]:
+    """
+    Extracts every page's tables using a pool of processes.
+
+    Page 1 is extracted from the already-open document (its layout was
+    parsed for type detection) while the remaining pages are split into
+    contiguous ranges, one per process. Results are yielded in page order
+    as soon as the range holding the next page has finished.
+
+    The processes are started for this call, children of the calling
+    process, and none outlive it: ranges still running when it ends early
+    are killed, and all of them exit if the caller is killed.
+
+    Args:
+        source: The PDF source, reopened by each process. In-memory and
+            file-object sources are sent to the processes as bytes.
+        document: The open document, used for page 1.
+        workers: Number of extraction processes.
+        deadline: Checked by every process between pages.
+        template: Layout template key (see PDFDocument.page_tables).
+        engine: Extraction engine (see PDFDocument.page_tables).
+        backend: PDF backend each process opens the document with.
+
+    Yields:
+        The list of tables on each page, in page order.
+    """
+    page_count = document.page_count
+    if page_count == 0:
+        return
+
+    shared_source = picklable_source(source)
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_die_with_parent, initargs=(os.getpid(),)
+    )
+    futures = []
+    try:
+        futures = [
+            executor.submit(
+                _extract_page_range, shared_source, start, stop, deadline,
+                template, engine, backend
+            )
+            for start, stop in _page_ranges(1, page_count, workers)
+        ]
+
+        yield document.page_tables(0, template, engine)
+        document.release_page(0)
+
+        for future in futures:
+            timeout = max(0, deadline.remaining()) if deadline is not None else None
+            try:
+                page_tables = future.result(timeout=timeout)
+            except FuturesTimeoutError:
+                raise TimeoutException(
+                    f"Operation timed out after {deadline.seconds:g} seconds"
+                )
+            yield from page_tables
+    finally:
+        if not all(future.done() for future in futures):
+            # An error, a timeout or a caller that stopped early: ranges
+            # still running are killed rather than left to their next
+            # deadline check
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,15 +1,14 @@
-import pdfplumber
-import pandas as pd
 import re
-import signal
-from contextlib import contextmanager
-from typing import List, Dict, Any
-from .utils import get_pdf_type
-
-
-class TimeoutException(Exception):
-    """Raised when PDF processing exceeds timeout"""
-    pass
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+from .deadline import Deadline, TimeoutException
+from .document import PDFDocument, PDFSource
+from .events import ScheduleEvent
+from .parallel import PARALLEL_MIN_PAGES, iter_page_tables_parallel
+from .templates import template_key
+from .timing import StageTimings, timed
+from .utils import resolve_pdf_type
 
 
 class PDFSizeException(Exception):
@@ -17,100 +16,188 @@ class PDFSizeException(Exception):
     pass
 
 
-@contextmanager
-def timeout(seconds):
-    """Context manager for timeout protection"""
-    def signal_handler(signum, frame):
-        raise TimeoutException(f"Operation timed out after {seconds} seconds")
-    
-    # Set the signal handler and alarm
-    signal.signal(signal.SIGALRM, signal_handler)
-    signal.alarm(seconds)
-    try:
-        yield
-    finally:
-        # Disable the alarm
-        signal.alarm(0)
+# Time ranges inside a lecture Time cell, e.g. "08:30 - 09:20"
+_TIME_RANGE_PATTERN = re.compile(r'\d{2}:\d{2}\s*-\s*\d{2}:\d{2}')
+
+# Upper bound on document size accepted for parsing
+MAX_PAGES = 100
+
+# Time allowed for a parse when the caller does not set a deadline
+DEFAULT_TIMEOUT_SECONDS = 60
 
+# Table extraction engines a caller may choose; 'auto' uses the word engine
+# for the spreadsheet-exported lecture PDFs and pdfplumber's otherwise, and
+# always on the pymupdf backend, where it is the natively implemented engine
+EXTRACTION_ENGINES = ('auto', 'tables', 'words')
 
-def _parse_weekly_schedule(tables: List[List[str]]) -> List[Dict[str, Any]]:
+
+def _table_rows(
+    table: List[List[str]],
+    headers: List[str],
+    fill_columns: List[str],
+    required_columns: List[str],
+    filled: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, str]]:
     """
-    Parses the raw table data from a weekly schedule PDF.
+    Normalises one raw table into row dictionaries keyed by header.
+
+    Works column-wise on plain lists: pads short rows, forward-fills the
+    fill_columns (empty or missing cells take the value above them), then
+    converts every cell to a stripped string. Missing cells that cannot be
+    filled become the string 'None', as they always have.
+
+    Args:
+        table: Raw table from extraction; the first row is the header.
+        headers: Column names shared by every table in the document.
+        fill_columns: Columns whose values span multiple rows.
+        required_columns: Columns that must exist in the headers.
+        filled: Last value seen per fill column. Read to fill leading empty
+            cells and updated in place, so a table continuing from the
+            previous page picks up where it left off.
+
+    Returns:
+        List of row dictionaries in table order.
+
+    Raises:
+        KeyError: If any required column is missing from the headers.
+        ValueError: If the table's rows are wider or narrower than the headers.
     """
-    events = []
-    headers = [h.replace('\n', ' ') for h in tables[0][0]]
+    if filled is None:
+        filled = {}
 
-    for table in tables:
-        df = pd.DataFrame(table[1:], columns=headers)
-        df.columns = [col.replace('\n', ' ') for col in df.columns]
-
-        for col in ['Module', 'Offered', 'Group', 'Lang']:
-            if col in df.columns:
-                df[col] = df[col].replace('', None).ffill()
-
-        for col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-
-        df.dropna(subset=['Day', 'Time'], inplace=True, how='all')
-
-        for _, row in df.iterrows():
-            base_event = row.to_dict()
-            days = str(base_event['Day']).split('\n')
-            times = re.findall(r'\d{2}:\d{2}\s*-\s*\d{2}:\d{2}', str(base_event['Time']))
-            venues = str(base_event['Venue']).split('\n')
-            activities = str(base_event['Activity']).split('\n')
-
-            max_len = len(days)
-            times.extend([times[-1]] * (max_len - len(times))) if times else None
-            venues.extend([venues[-1]] * (max_len - len(venues))) if venues else None
-            activities.extend([activities[-1]] * (max_len - len(activities))) if activities else None
-
-            for i in range(max_len):
-                if i < len(times) and i < len(venues) and i < len(activities):
-                    event = base_event.copy()
-                    event['Day'] = days[i].strip()
-                    event['Time'] = times[i].strip()
-                    event['Venue'] = venues[i].strip()
-                    event['Activity'] = activities[i].strip()
-                    events.append(event)
-    return events
+    missing = [col for col in required_columns if col not in headers]
+    if missing:
+        raise KeyError(missing)
+    if len(set(headers)) != len(headers):
+        raise ValueError(f"Duplicate table headers: {headers}")
+
+    rows = table[1:]
+    if not rows:
+        return []
 
+    width = max(len(row) for row in rows)
+    if width != len(headers):
+        raise ValueError(
+            f"{len(headers)} columns passed, passed data had {width} columns"
+        )
 
-def _parse_test_schedule(tables: List[List[str]]) -> List[Dict[str, Any]]:
+    # Transpose into columns, padding short rows with missing cells
+    columns = [
+        [row[i] if i < len(row) else None for row in rows]
+        for i in range(width)
+    ]
+
+    for col in fill_columns:
+        if col not in headers:
+            continue
+        cells = columns[headers.index(col)]
+        previous = filled.get(col)
+        for i, value in enumerate(cells):
+            if value is None or value == '':
+                cells[i] = previous
+            else:
+                previous = value
+        filled[col] = previous
+
+    columns = [[str(value).strip() for value in cells] for cells in columns]
+    return [dict(zip(headers, values)) for values in zip(*columns)]
+
+
+class _ScheduleTableParser(ABC):
     """
-    Parses the raw table data from a test schedule PDF.
+    Turns a document's tables into events, one table at a time.
+
+    The header row of the first table fed in names the columns of every
+    table. Forward-fill state is kept between tables so that rows spanning
+    a page break are filled from the previous page. Subclasses define the
+    mode-specific columns and row expansion.
     """
-    events = []
-    headers = [h.replace('\n', ' ') for h in tables[0][0]]
 
-    for table in tables:
-        df = pd.DataFrame(table[1:], columns=headers)
-        df.columns = [col.replace('\n', ' ') for col in df.columns]
-
-        for col in ['Module', 'Test']:
-            if col in df.columns:
-                df[col] = df[col].replace('', None).ffill()
-
-        for col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-
-        df.dropna(subset=['Date', 'Time'], inplace=True, how='all')
-
-        for _, row in df.iterrows():
-            base_event = row.to_dict()
-            venues = str(base_event['Venue']).split('\n')
-            for venue in venues:
-                if venue:
-                    event = base_event.copy()
-                    event['Venue'] = venue.strip()
-                    events.append(event)
-    return events
+    fill_columns: List[str] = []
+    required_columns: List[str] = []
+
+    def __init__(self):
+        self.headers: Optional[List[str]] = None
+        self._filled: Dict[str, Any] = {}
+
+    def feed(self, table: List[List[str]]) -> List[ScheduleEvent]:
+        """
+        Parses the next table of the document.
+
+        Args:
+            table: Raw table from extraction, header row first.
+
+        Returns:
+            Events for the table's rows.
+        """
+        if self.headers is None:
+            self.headers = [h.replace('\n', ' ') for h in table[0]]
+        rows = _table_rows(
+            table, self.headers,
+            self.fill_columns, self.required_columns, self._filled
+        )
+        events = []
+        for row in rows:
+            self._expand(row, events)
+        return events
+
+    @abstractmethod
+    def _expand(self, row: Dict[str, str], events: List[ScheduleEvent]) -> None:
+        """Appends the events of one table row to events."""
+
+
+class _WeeklyScheduleParser(_ScheduleTableParser):
+    """Lecture rows: one event per newline-separated day."""
+
+    fill_columns = ['Module', 'Offered', 'Group', 'Lang']
+    required_columns = ['Day', 'Time']
+
+    def _expand(self, row: Dict[str, str], events: List[ScheduleEvent]) -> None:
+        days = row['Day'].split('\n')
+        times = _TIME_RANGE_PATTERN.findall(row['Time'])
+        venues = row['Venue'].split('\n')
+        activities = row['Activity'].split('\n')
 
+        # A lecture without any time range yields no events
+        if not times:
+            return
 
-def _parse_exam_schedule(tables: List[List[str]]) -> List[Dict[str, Any]]:
+        # Shorter columns repeat their last value for the remaining days
+        for i, day in enumerate(days):
+            events.append(ScheduleEvent(
+                module=row.get('Module', ''),
+                activity=activities[min(i, len(activities) - 1)].strip(),
+                time=times[min(i, len(times) - 1)].strip(),
+                venue=venues[min(i, len(venues) - 1)].strip(),
+                group=row.get('Group'),
+                day=day.strip(),
+                semester=row.get('Offered'),
+            ))
+
+
+class _TestScheduleParser(_ScheduleTableParser):
+    """Test rows: one event per newline-separated venue."""
+
+    fill_columns = ['Module', 'Test']
+    required_columns = ['Date', 'Time']
+
+    def _expand(self, row: Dict[str, str], events: List[ScheduleEvent]) -> None:
+        for venue in row['Venue'].split('\n'):
+            if venue:
+                events.append(ScheduleEvent(
+                    module=row.get('Module', ''),
+                    activity=row.get('Test', ''),
+                    time=row['Time'],
+                    venue=venue.strip(),
+                    day=row.get('Day'),
+                    date=row['Date'],
+                ))
+
+
+class _ExamScheduleParser(_ScheduleTableParser):
     """
-    Parses the raw table data from an exam schedule PDF.
-    
+    Exam rows: one event per row.
+
     Exam schedules have a different structure from tests:
     - Status (e.g., "FINAL")
     - Module code
@@ -122,107 +209,260 @@ def _parse_exam_schedule(tables: List[List[str]]) -> List[Dict[str, Any]]:
     - Exam Campus
     - Venue (may have newline-separated details like "IT Building CBT Labs\n1,2,3")
     - Exam Comments
-    
-    Returns:
-        List of event dictionaries with exam information.
     """
+
+    # Module and status span multiple rows and are forward-filled
+    fill_columns = ['Module', 'Status']
+    required_columns = ['Date', 'Start Time']
+
+    def _expand(self, row: Dict[str, str], events: List[ScheduleEvent]) -> None:
+        # Combine venue details (newline-separated parts become single string)
+        venue_parts = row.get('Venue', '').split('\n')
+        venue = ' '.join(part.strip() for part in venue_parts if part.strip())
+
+        # Note: Exam PDFs don't have end time; process_events() defaults
+        # the duration to 3 hours
+        events.append(ScheduleEvent(
+            module=row.get('Module', ''),
+            activity=row.get('Activity', '').replace('\n', ' ').strip(),
+            time=row['Start Time'],
+            venue=venue,
+            day=row.get('Day'),
+            date=row['Date'],
+        ))
+
+
+# Mode-specific table parser for each detected PDF type
+_TABLE_PARSERS = {
+    'lecture': _WeeklyScheduleParser,
+    'test': _TestScheduleParser,
+    'exam': _ExamScheduleParser,
+}
+
+
+def _parse_tables(parser: _ScheduleTableParser, tables: List[List[str]]) -> List[ScheduleEvent]:
+    """Feeds every table to a parser and collects the events."""
     events = []
-    headers = [h.replace('\n', ' ') for h in tables[0][0]]
-    
     for table in tables:
-        df = pd.DataFrame(table[1:], columns=headers)
-        df.columns = [col.replace('\n', ' ') for col in df.columns]
-        
-        # Forward-fill module and status columns (they span multiple rows)
-        for col in ['Module', 'Status']:
-            if col in df.columns:
-                df[col] = df[col].replace('', None).ffill()
-        
-        # Clean whitespace from all columns
-        for col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-        
-        # Drop rows without date or start time
-        df.dropna(subset=['Date', 'Start Time'], inplace=True, how='all')
-        
-        # Process each row
-        for _, row in df.iterrows():
-            event = row.to_dict()
-            
-            # Combine venue details (newline-separated parts become single string)
-            if 'Venue' in event:
-                venue_parts = str(event['Venue']).split('\n')
-                event['Venue'] = ' '.join(part.strip() for part in venue_parts if part.strip())
-            
-            # Clean activity field (remove newlines)
-            if 'Activity' in event:
-                event['Activity'] = str(event['Activity']).replace('\n', ' ').strip()
-            
-            # Note: Exam PDFs don't have end time, we'll need to estimate duration
-            # Default to 3 hours for exams
-            if 'Start Time' in event:
-                event['Time'] = event['Start Time']  # Will be processed later
-            
-            events.append(event)
-    
+        events.extend(parser.feed(table))
     return events
 
 
-def parse_pdf(file_path: str) -> Dict[str, Any]:
+def _parse_weekly_schedule(tables: List[List[str]]) -> List[ScheduleEvent]:
+    """
+    Parses the raw table data from a weekly schedule PDF.
+    """
+    return _parse_tables(_WeeklyScheduleParser(), tables)
+
+
+def _parse_test_schedule(tables: List[List[str]]) -> List[ScheduleEvent]:
+    """
+    Parses the raw table data from a test schedule PDF.
+    """
+    return _parse_tables(_TestScheduleParser(), tables)
+
+
+def _parse_exam_schedule(tables: List[List[str]]) -> List[ScheduleEvent]:
+    """
+    Parses the raw table data from an exam schedule PDF.
+    
+    Returns:
+        List of exam events.
+    """
+    return _parse_tables(_ExamScheduleParser(), tables)
+
+
+def _select_engine(engine: str, pdf_type: str, backend: str = 'pdfplumber') -> str:
+    """Resolves the requested extraction engine for a document type and backend."""
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(
+            f"Unknown extraction engine '{engine}'. "
+            f"Expected one of: {', '.join(EXTRACTION_ENGINES)}."
+        )
+    if engine == 'auto':
+        return 'words' if pdf_type == 'lecture' or backend == 'pymupdf' else 'tables'
+    return engine
+
+
+def _iter_page_tables(
+    document: PDFDocument,
+    deadline: Deadline,
+    template: Optional[Hashable] = None,
+    engine: str = 'tables',
+) -> Iterator[List[List[List[str]]]]:
+    """Extracts each page's tables in order in this process."""
+    for index in range(document.page_count):
+        deadline.check()
+        tables = document.page_tables(index, template, engine)
+        document.release_page(index)
+        yield tables
+
+
+def iter_pdf_events(
+    source: PDFSource,
+    deadline: Optional[Deadline] = None,
+    extract_workers: int = 1,
+    parallel_min_pages: int = PARALLEL_MIN_PAGES,
+    pdf_type: Optional[str] = None,
+    engine: str = 'auto',
+    backend: str = 'pdfplumber',
+    timings: Optional[StageTimings] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parses a Tuks schedule PDF page by page.
+
+    Only one page's tables are held at a time, and events for a page are
+    yielded as soon as its tables are extracted, so callers can stream
+    results while later pages are still being read.
+
+    Args:
+        source: The absolute path to the PDF file, its bytes, or a
+            seekable binary file object.
+        deadline: Checked between pages and tables; defaults to
+            DEFAULT_TIMEOUT_SECONDS from the first call to next().
+        extract_workers: Processes to extract pages with. Values above 1
+            enable parallel extraction for large documents.
+        parallel_min_pages: Minimum page count for parallel extraction;
+            smaller documents are extracted in this process.
+        pdf_type: Type declared by the caller ('lecture', 'test' or
+            'exam'). Skips keyword detection unless the first page's
+            heading names a different type.
+        engine: Table extraction engine, one of EXTRACTION_ENGINES.
+            Both engines produce the same tables; 'words' is much cheaper
+            on fully ruled pages and falls back to 'tables' elsewhere.
+        backend: PDF library to read the document with, one of
+            document.BACKENDS. Both give the same events.
+        timings: Records the 'open' and 'detect' stages, and per page
+            the 'extract' (time waited for the page's tables, which with
+            parallel extraction overlaps other pages) and 'parse' stages.
+
+    Yields:
+        First a header {'type': ..., 'pages': ...}, then one
+        {'page': page_number, 'events': [ScheduleEvent, ...]} per page,
+        in page order.
+
+    Raises:
+        TimeoutException: If the deadline passes
+        PDFSizeException: If PDF exceeds MAX_PAGES pages
+        ValueError: If the PDF type cannot be determined or contradicts the
+            declared type, the engine or backend is unknown, or the PDF
+            contains no tables
+    """
+    if deadline is None:
+        deadline = Deadline(DEFAULT_TIMEOUT_SECONDS)
+    # Time spent queued counts against the caller's deadline
+    deadline.check()
+
+    # Detection, the page limit and extraction share one open document
+    opened = time.perf_counter()
+    with PDFDocument.open(source, backend) as document:
+        if timings is not None:
+            timings.add('open', time.perf_counter() - opened)
+        with timed(timings, 'detect'):
+            pdf_type = resolve_pdf_type(document, pdf_type)
+
+        if pdf_type == 'unknown':
+            raise ValueError(
+                "Unable to determine PDF type. "
+                "Expected 'Lectures', 'Semester Tests', or 'Exams' text."
+            )
+
+        # Enforce page limit
+        if document.page_count > MAX_PAGES:
+            raise PDFSizeException(
+                f"PDF exceeds maximum page limit. "
+                f"Found {document.page_count} pages, maximum is {MAX_PAGES} pages."
+            )
+
+        engine = _select_engine(engine, pdf_type, backend)
+
+        yield {'type': pdf_type, 'pages': document.page_count}
+
+        # Pages laid out like earlier PDFs from the same generator reuse
+        # their learned column grid
+        template = template_key(pdf_type, document.metadata)
+        if extract_workers > 1 and document.page_count >= parallel_min_pages:
+            page_tables = iter_page_tables_parallel(
+                source, document, extract_workers, deadline, template, engine,
+                backend
+            )
+        else:
+            page_tables = _iter_page_tables(document, deadline, template, engine)
+        if timings is not None:
+            page_tables = timings.iterate('extract', page_tables)
+
+        parser = _TABLE_PARSERS[pdf_type]()
+        for page_number, tables in enumerate(page_tables, start=1):
+            events = []
+            with timed(timings, 'parse'):
+                for table in tables:
+                    deadline.check()
+                    events.extend(parser.feed(table))
+            yield {'page': page_number, 'events': events}
+
+        if parser.headers is None:
+            raise ValueError("No schedule tables found in PDF")
+
+
+def parse_pdf(
+    source: PDFSource,
+    deadline: Optional[Deadline] = None,
+    extract_workers: int = 1,
+    parallel_min_pages: int = PARALLEL_MIN_PAGES,
+    pdf_type: Optional[str] = None,
+    engine: str = 'auto',
+    backend: str = 'pdfplumber',
+    timings: Optional[StageTimings] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
     """
     Parses a Tuks schedule PDF to extract table data.
     
-    Includes timeout protection (60 seconds) and page limit validation (100 pages).
+    Includes timeout protection (60 seconds unless a deadline is given) and
+    page limit validation (100 pages). The timeout is checked between pages
+    and tables, so it works from any thread or process.
+    
+    Args:
+        source: The absolute path to the PDF file, its bytes, or a
+            seekable binary file object.
+        deadline: Caller's deadline for the whole parse.
+        extract_workers: Processes to extract pages with (see
+            iter_pdf_events); 1 extracts serially.
+        parallel_min_pages: Minimum page count for parallel extraction.
+        pdf_type: Type declared by the caller, or None to detect it.
+        engine: Table extraction engine (see iter_pdf_events).
+        backend: PDF library to read the document with.
+        timings: Records each stage's duration (see iter_pdf_events).
+        progress: Called with (pages parsed, page count) after each page.
     
     Returns:
-        Dictionary with 'events' list and 'type' field 
-        ('lecture', 'test', or 'exam')
+        Dictionary with 'events' list of ScheduleEvent, 'type' field 
+        ('lecture', 'test', or 'exam') and 'pages' count
     
     Raises:
-        TimeoutException: If parsing exceeds 60 seconds
-        PDFSizeException: If PDF exceeds 100 pages
-        ValueError: If PDF type cannot be determined or parsing fails
+        ValueError: If PDF type cannot be determined, parsing fails, the
+            PDF exceeds 100 pages or the deadline passes
     """
     try:
-        with timeout(60):  # 60 second timeout
-            pdf_type = get_pdf_type(file_path)
-            
-            if pdf_type == 'unknown':
-                raise ValueError(
-                    "Unable to determine PDF type. "
-                    "Expected 'Lectures', 'Semester Tests', or 'Exams' text."
-                )
-
-            with pdfplumber.open(file_path) as pdf:
-                # Enforce page limit
-                if len(pdf.pages) > 100:
-                    raise PDFSizeException(
-                        f"PDF exceeds maximum page limit. "
-                        f"Found {len(pdf.pages)} pages, maximum is 100 pages."
-                    )
-                
-                all_tables = []
-                for page in pdf.pages:
-                    tables = page.extract_tables()
-                    for table in tables:
-                        all_tables.append(table)
-
-            # Route to appropriate parser based on detected type
-            if pdf_type == 'lecture':
-                events = _parse_weekly_schedule(all_tables)
-            elif pdf_type == 'test':
-                events = _parse_test_schedule(all_tables)
-            elif pdf_type == 'exam':
-                events = _parse_exam_schedule(all_tables)
-            else:
-                # This should never be reached due to the check above,
-                # but included for completeness
-                raise ValueError(f"Unsupported PDF type: {pdf_type}")
-
-            return {
-                'events': events,
-                'type': pdf_type
-            }
+        pages = iter_pdf_events(
+            source, deadline, extract_workers, parallel_min_pages, pdf_type, engine,
+            backend, timings
+        )
+        header = next(pages)
+        if progress is not None:
+            progress(0, header['pages'])
+
+        events = []
+        for done, page in enumerate(pages, 1):
+            events.extend(page['events'])
+            if progress is not None:
+                progress(done, header['pages'])
+
+        return {
+            'events': events,
+            'type': header['type'],
+            'pages': header['pages']
+        }
     except TimeoutException as e:
         raise ValueError(f"PDF parsing timeout: {str(e)}")
     except PDFSizeException as e:
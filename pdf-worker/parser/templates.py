@@ -0,0 +1,201 @@
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from pdfplumber.page import Page
+from pdfplumber.table import Table
+from pdfplumber.utils import extract_text
+
+# Distance within which two rules are the same column boundary; matches
+# pdfplumber's default snap tolerance
+_SNAP_TOLERANCE = 3
+
+# Shorter vertical edges (e.g. the ends of horizontal rules) are not rules;
+# matches pdfplumber's default edge_min_length
+_MIN_EDGE_LENGTH = 3
+
+
+class TableTemplate:
+    """
+    Learned geometry of one schedule generator's tables.
+
+    UP's lecture, test and exam PDFs come from a handful of generators,
+    each drawing every page's table on the same column grid. Once a page
+    of a given type and producer has been extracted generically, its
+    column boundaries and table x-extent are kept here, and later pages
+    whose vertical rules line up with them are extracted with explicit
+    vertical lines and a single-pass cell fill instead of pdfplumber's
+    generic edge detection and per-row char scans.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, columns: Sequence[float]):
+        self.columns = tuple(columns)
+
+    @property
+    def bbox_x(self) -> Tuple[float, float]:
+        """Left and right edge of the table."""
+        return self.columns[0], self.columns[-1]
+
+    @classmethod
+    def learn(cls, tables: List[Table]) -> Optional['TableTemplate']:
+        """
+        Learns a template from a page's generically found tables.
+
+        Returns:
+            The template, or None unless the page holds exactly one table
+            with a regular grid.
+        """
+        if len(tables) != 1 or not _is_regular(tables[0]):
+            return None
+        cells = tables[0].cells
+        return cls(sorted({cell[0] for cell in cells} | {cell[2] for cell in cells}))
+
+    def matches(self, page: Page) -> bool:
+        """
+        Whether a page's vertical rules inside the table are exactly the
+        template's column boundaries.
+        """
+        left, right = self.bbox_x
+        rules = [
+            edge['x0'] for edge in page.edges
+            if edge['orientation'] == 'v'
+            and edge['height'] >= _MIN_EDGE_LENGTH
+            and left - _SNAP_TOLERANCE <= edge['x0'] <= right + _SNAP_TOLERANCE
+        ]
+        if not rules:
+            return False
+
+        seen = set()
+        for x in rules:
+            index = self._nearest_column(x)
+            if abs(self.columns[index] - x) > _SNAP_TOLERANCE:
+                # A rule the template doesn't know: different layout
+                return False
+            seen.add(index)
+        return len(seen) == len(self.columns)
+
+    def _nearest_column(self, x: float) -> int:
+        index = bisect_right(self.columns, x)
+        if index == len(self.columns):
+            return index - 1
+        if index > 0 and x - self.columns[index - 1] <= self.columns[index] - x:
+            return index - 1
+        return index
+
+
+# Templates learned in this process, keyed by template_key()
+_TEMPLATES: Dict[Hashable, TableTemplate] = {}
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def template_key(pdf_type: str, metadata: Dict[str, Any]) -> Hashable:
+    """
+    Builds the registry key for a document's tables.
+
+    Args:
+        pdf_type: The schedule type.
+        metadata: The document's info dictionary.
+
+    Returns:
+        Key combining the type with the PDF's producer.
+    """
+    producer = metadata.get('Producer') or ''
+    if isinstance(producer, bytes):
+        producer = producer.decode('latin-1')
+    # Some generators pad the producer with control characters
+    producer = ''.join(ch for ch in str(producer) if ch.isprintable()).strip()
+    return pdf_type, producer
+
+
+def extract_page_tables(page: Page, key: Optional[Hashable] = None) -> List[List[List[Optional[str]]]]:
+    """
+    Extracts every table on a page, using the learned template for `key`
+    when the page matches it.
+
+    Output is identical to page.extract_tables(). Pages that don't match
+    their template, and every page when key is None, go through generic
+    detection; the first regular page seen for a key teaches its template.
+
+    Args:
+        page: The pdfplumber page.
+        key: template_key() of the document, or None to skip templates.
+
+    Returns:
+        List of tables, each a list of rows of cell strings.
+    """
+    template = _TEMPLATES.get(key) if key is not None else None
+
+    if template is not None and template.matches(page):
+        tables = page.find_tables({
+            'vertical_strategy': 'explicit',
+            'explicit_vertical_lines': list(template.columns),
+            'horizontal_strategy': 'lines',
+        })
+        columns = len(template.columns) - 1
+        if tables and all(len(table.rows[0].cells) == columns for table in tables):
+            return [_extract_table(page, table) for table in tables]
+
+    tables = page.find_tables()
+    if key is not None and template is None:
+        learned = TableTemplate.learn(tables)
+        if learned is not None:
+            with _TEMPLATES_LOCK:
+                _TEMPLATES.setdefault(key, learned)
+    return [_extract_table(page, table) for table in tables]
+
+
+def _is_regular(table: Table) -> bool:
+    """Whether every row has all its cells, on one height and one set of columns."""
+    rows = table.rows
+    if not rows or any(cell is None for cell in rows[0].cells):
+        return False
+    columns = [(cell[0], cell[2]) for cell in rows[0].cells]
+    for row in rows:
+        if any(cell is None for cell in row.cells):
+            return False
+        if [(cell[0], cell[2]) for cell in row.cells] != columns:
+            return False
+        if len({cell[3] for cell in row.cells}) != 1:
+            return False
+    return True
+
+
+def _extract_table(page: Page, table: Table) -> List[List[Optional[str]]]:
+    """
+    Table.extract() for regular grids, filling cells in one pass.
+
+    Table.extract() rescans every char on the page for each row and every
+    row char for each cell. In a regular grid each char's cell follows from
+    its midpoint by bisection, so the page's chars are bucketed once.
+    Irregular tables (merged cells) are left to Table.extract().
+    """
+    if not _is_regular(table):
+        return table.extract()
+
+    rows = table.rows
+    tops = [row.cells[0][1] for row in rows]
+    bottoms = [row.cells[0][3] for row in rows]
+    lefts = [cell[0] for cell in rows[0].cells]
+    rights = [cell[2] for cell in rows[0].cells]
+    buckets: List[List[List[Dict[str, Any]]]] = [[[] for _ in lefts] for _ in rows]
+
+    for char in page.chars:
+        v_mid = (char['top'] + char['bottom']) / 2
+        r = bisect_right(tops, v_mid) - 1
+        if r < 0 or v_mid >= bottoms[r]:
+            continue
+        h_mid = (char['x0'] + char['x1']) / 2
+        c = bisect_right(lefts, h_mid) - 1
+        if c < 0 or h_mid >= rights[c]:
+            continue
+        buckets[r][c].append(char)
+
+    return [
+        [
+            extract_text(chars, x_shift=cell[0], y_shift=cell[1]) if chars else ''
+            for cell, chars in zip(row.cells, row_buckets)
+        ]
+        for row, row_buckets in zip(rows, buckets)
+    ]
@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class StageTimings:
+    """
+    Wall-clock seconds one parse spent in each of its stages.
+
+    Parsers record into it when one is passed in; the service turns the
+    recorded durations into metrics. Stages that repeat per page (e.g.
+    'extract') hold one duration per page.
+    """
+
+    __slots__ = ('stages',)
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Records one duration of a stage."""
+        self.stages.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Records the duration of the block as one run of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def iterate(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """
+        Yields from an iterable, recording the time each item took to
+        produce (e.g. a page's extraction) as one run of a stage.
+        """
+        iterator = iter(items)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                self.add(stage, time.perf_counter() - start)
+                yield item
+        finally:
+            # A generator's own cleanup (e.g. stopping extraction
+            # processes) runs when the caller stops early
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+
+def timed(timings: Optional[StageTimings], stage: str) -> ContextManager[None]:
+    """StageTimings.time() for an optional recorder; a no-op without one."""
+    return timings.time(stage) if timings is not None else nullcontext()
@@ -1,36 +1,155 @@
-import pdfplumber
-from typing import Literal
+import re
+from typing import List, Literal, Optional, Union
+from .document import PDFDocument, PDFSource
 
+# Types a caller may declare instead of relying on detection
+PDF_TYPES = ('lecture', 'test', 'exam')
 
-def get_pdf_type(file_path: str) -> Literal['lecture', 'test', 'exam', 'unknown']:
+# Text-showing operators in a content stream: a literal string shown with
+# Tj, ' or ", or an array of literals (with kerning offsets) shown with TJ
+_TEXT_OPERATOR_PATTERN = re.compile(
+    rb'\[((?:\\.|[^\\\]])*)\]\s*TJ'
+    rb'|\(((?:\\.|[^\\()])*)\)\s*(?:Tj|\'|")'
+)
+_LITERAL_PATTERN = re.compile(rb'\(((?:\\.|[^\\()])*)\)')
+_ESCAPE_PATTERN = re.compile(rb'\\([0-7]{1,3}|.)', re.DOTALL)
+_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def get_pdf_type(source: Union[PDFSource, PDFDocument]) -> Literal['lecture', 'test', 'exam', 'unknown']:
     """
     Determines the type of schedule PDF by scanning the first page
     for mode-identifying keywords.
-    
+
+    The page's raw text operators are scanned first, which needs no layout
+    analysis; full text extraction is only used when they don't name a
+    type (e.g. text drawn with a custom font encoding).
+
     Args:
-        file_path: The absolute path to the PDF file.
-    
+        source: The absolute path to the PDF file, its bytes or a binary
+            file object, or an already-open PDFDocument (which is left open).
+
     Returns:
         'lecture', 'test', 'exam', or 'unknown' based on content.
     """
-    with pdfplumber.open(file_path) as pdf:
-        if len(pdf.pages) == 0:
-            return 'unknown'
-        
-        # Only check first page for efficiency
-        first_page = pdf.pages[0]
-        text = first_page.extract_text()
-        
-        if not text:
-            return 'unknown'
-        
-        # Check for mode keywords (order matters for specificity)
-        # Note: Check "Semester Tests" before "Exams" to avoid false positives
-        if "Semester Tests" in text:
-            return 'test'
-        if "Exams" in text:
-            return 'exam'
-        if "Lectures" in text:
-            return 'lecture'
-        
+    if isinstance(source, PDFDocument):
+        return _detect_pdf_type(source)
+
+    with PDFDocument.open(source) as document:
+        return _detect_pdf_type(document)
+
+
+def resolve_pdf_type(
+    document: PDFDocument,
+    declared: Optional[str] = None,
+) -> Literal['lecture', 'test', 'exam', 'unknown']:
+    """
+    Settles the type of an open schedule PDF, trusting a declared type
+    unless the document plainly says otherwise.
+
+    A declared type is only checked against the raw operator scan; if that
+    is inconclusive the declaration is accepted without extracting any text.
+
+    Args:
+        document: The open document.
+        declared: Type sent by the caller ('lecture', 'test' or 'exam'),
+            or None to detect it.
+
+    Returns:
+        'lecture', 'test', 'exam', or 'unknown' based on content.
+
+    Raises:
+        ValueError: If the declared type is not a known type, or the
+            document's heading names a different one
+    """
+    if declared is None:
+        return _detect_pdf_type(document)
+
+    if declared not in PDF_TYPES:
+        raise ValueError(
+            f"Unknown PDF type '{declared}'. Expected one of: {', '.join(PDF_TYPES)}."
+        )
+
+    scanned = _scan_pdf_type(document)
+    if scanned not in ('unknown', declared):
+        raise ValueError(
+            f"PDF declared as '{declared}' but its first page identifies it as '{scanned}'."
+        )
+    return declared
+
+
+def _detect_pdf_type(document: PDFDocument) -> Literal['lecture', 'test', 'exam', 'unknown']:
+    """Keyword scan behind get_pdf_type, run against an open document."""
+    if document.page_count == 0:
+        return 'unknown'
+
+    pdf_type = _scan_pdf_type(document)
+    if pdf_type != 'unknown':
+        return pdf_type
+
+    # Only check first page for efficiency
+    return _match_pdf_type(document.page_text(0))
+
+
+def _scan_pdf_type(document: PDFDocument) -> Literal['lecture', 'test', 'exam', 'unknown']:
+    """Keyword scan over the first page's raw text operators."""
+    if document.page_count == 0:
+        return 'unknown'
+
+    try:
+        content = document.page_content(0)
+    except Exception:
+        # Unreadable streams fail properly during extraction
+        return 'unknown'
+
+    return _match_pdf_type(' '.join(_text_operator_strings(content)))
+
+
+def _text_operator_strings(content: bytes) -> List[str]:
+    """
+    Decodes the literal strings shown by a content stream's text operators.
+
+    Hex strings and font-specific encodings are not decoded; those pages
+    simply yield no keywords here.
+    """
+    strings = []
+    for match in _TEXT_OPERATOR_PATTERN.finditer(content):
+        array, literal = match.groups()
+        if array is not None:
+            # Kerned pieces of one run of text
+            raw = b''.join(_LITERAL_PATTERN.findall(array))
+        else:
+            raw = literal
+        strings.append(_unescape(raw).decode('latin-1'))
+    return strings
+
+
+def _unescape(raw: bytes) -> bytes:
+    """Resolves backslash escapes in a PDF literal string."""
+    def replace(match):
+        escape = match.group(1)
+        if escape[:1].isdigit():
+            return bytes([int(escape, 8) & 0xFF])
+        if escape in b'\r\n':
+            # Line continuation
+            return b''
+        return _ESCAPES.get(escape, escape)
+
+    return _ESCAPE_PATTERN.sub(replace, raw)
+
+
+def _match_pdf_type(text: Optional[str]) -> Literal['lecture', 'test', 'exam', 'unknown']:
+    """Maps first-page text to a schedule type by its mode keyword."""
+    if not text:
         return 'unknown'
+
+    # Check for mode keywords (order matters for specificity)
+    # Note: Check "Semester Tests" before "Exams" to avoid false positives
+    if "Semester Tests" in text:
+        return 'test'
+    if "Exams" in text:
+        return 'exam'
+    if "Lectures" in text:
+        return 'lecture'
+
+    return 'unknown'
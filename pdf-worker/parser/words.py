@@ -0,0 +1,157 @@
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pdfplumber.page import Page
+from pdfplumber.utils import cluster_list, cluster_objects
+from pdfplumber.utils.text import WordExtractor
+
+# Rules closer than this are one rule, and rules must reach within this of
+# the grid's edges; matches pdfplumber's default snap/join tolerances
+_RULE_TOLERANCE = 3
+
+# Shorter edges (e.g. the ends of a thin rule drawn as a rect) are not rules
+_MIN_EDGE_LENGTH = 3
+
+# Words whose tops are this close are one line of a cell, as in
+# pdfplumber's extract_text()
+_LINE_TOLERANCE = 3
+
+
+def extract_word_tables(page: Page) -> Optional[List[List[List[str]]]]:
+    """
+    Extracts a page's table by binning words into the grid drawn by its rules.
+
+    The XLS-exported schedules draw one full grid per page: every column
+    rule runs the table's height and every row rule its width. For those,
+    the grid follows directly from the rule positions, and words are read
+    once per column and dropped into their row by y. This skips
+    pdfplumber's intersection and cell reconstruction, and its per-row
+    rescans of the page's chars, while producing the same cell text as
+    page.extract_tables().
+
+    Args:
+        page: The pdfplumber page.
+
+    Returns:
+        A single-table list in extract_tables() form, or None if the page
+        is not drawn as one full grid (use extract_tables() instead).
+    """
+    grid = rule_grid(page.edges)
+    if grid is None:
+        return None
+    xs, ys = grid
+
+    # Words are formed per column: forming them page-wide lets lines of
+    # neighbouring columns chain into one when clustering by y
+    columns: List[List[Dict[str, Any]]] = [[] for _ in xs[:-1]]
+    for char in page.chars:
+        h_mid = (char['x0'] + char['x1']) / 2
+        c = bisect_right(xs, h_mid) - 1
+        if 0 <= c < len(columns) and h_mid < xs[-1]:
+            columns[c].append(char)
+
+    extractor = WordExtractor()
+    words = [word for column_chars in columns for word in extractor.extract_words(column_chars)]
+    return [grid_table(words, xs, ys)]
+
+
+def grid_table(words: List[Dict[str, Any]], xs: List[float], ys: List[float]) -> List[List[str]]:
+    """
+    Bins words into the cells of a ruled grid by their midpoints.
+
+    Args:
+        words: Words with x0, x1, top, bottom, doctop and text, in reading
+            order within each line.
+        xs: Column boundaries from rule_grid().
+        ys: Row boundaries from rule_grid().
+
+    Returns:
+        The table as rows of cell strings, lines joined as extract_text()
+        joins them.
+    """
+    cells: List[List[List[Dict[str, Any]]]] = [[[] for _ in xs[:-1]] for _ in ys[:-1]]
+    for word in words:
+        v_mid = (word['top'] + word['bottom']) / 2
+        r = bisect_right(ys, v_mid) - 1
+        if not (0 <= r < len(cells) and v_mid < ys[-1]):
+            continue
+        h_mid = (word['x0'] + word['x1']) / 2
+        c = bisect_right(xs, h_mid) - 1
+        if not (0 <= c < len(xs) - 1 and h_mid < xs[-1]):
+            continue
+        cells[r][c].append(word)
+
+    return [[_cell_text(cell_words) for cell_words in row] for row in cells]
+
+
+def _cell_text(words: List[Dict[str, Any]]) -> str:
+    """Joins a cell's words into lines the way extract_text() does."""
+    lines = cluster_objects(words, itemgetter('doctop'), _LINE_TOLERANCE)
+    return '\n'.join(' '.join(word['text'] for word in line) for line in lines)
+
+
+def rule_grid(edges: List[Dict[str, Any]]) -> Optional[Tuple[List[float], List[float]]]:
+    """
+    Finds the column and row boundaries of a page's single full grid.
+
+    Args:
+        edges: The page's edges in pdfplumber form (orientation, x0, x1,
+            top, bottom, width, height), e.g. Page.edges.
+
+    Returns:
+        Sorted column x positions and row y positions, or None unless
+        every column rule spans all rows and every row rule all columns.
+    """
+    vertical = [
+        edge for edge in edges
+        if edge['orientation'] == 'v' and edge['height'] >= _MIN_EDGE_LENGTH
+    ]
+    horizontal = [
+        edge for edge in edges
+        if edge['orientation'] == 'h' and edge['width'] >= _MIN_EDGE_LENGTH
+    ]
+    if not vertical or not horizontal:
+        return None
+
+    xs = _rule_positions([edge['x0'] for edge in vertical])
+    left, right = xs[0], xs[-1]
+    top = min(edge['top'] for edge in vertical)
+    bottom = max(edge['bottom'] for edge in vertical)
+
+    # Row rules are those crossing the whole grid
+    ys = _rule_positions([
+        edge['top'] for edge in horizontal
+        if edge['x0'] <= left + _RULE_TOLERANCE
+        and edge['x1'] >= right - _RULE_TOLERANCE
+        and top - _RULE_TOLERANCE <= edge['top'] <= bottom + _RULE_TOLERANCE
+    ])
+    if len(xs) < 2 or len(ys) < 2:
+        return None
+
+    # Every column rule must run unbroken from the first row rule to the last
+    for x in xs:
+        spans = sorted(
+            (edge['top'], edge['bottom']) for edge in vertical
+            if abs(edge['x0'] - x) <= _RULE_TOLERANCE
+        )
+        reach = spans[0][0]
+        if reach > ys[0] + _RULE_TOLERANCE:
+            return None
+        reach = spans[0][1]
+        for span_top, span_bottom in spans[1:]:
+            if span_top > reach + _RULE_TOLERANCE:
+                break
+            reach = max(reach, span_bottom)
+        if reach < ys[-1] - _RULE_TOLERANCE:
+            return None
+
+    return xs, ys
+
+
+def _rule_positions(values: List[float]) -> List[float]:
+    """Merges positions within _RULE_TOLERANCE into one, like pdfplumber's snapping."""
+    return [
+        sum(cluster) / len(cluster)
+        for cluster in cluster_list(values, _RULE_TOLERANCE)
+    ]
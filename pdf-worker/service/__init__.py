@@ -0,0 +1,34 @@
+# HTTP-side infrastructure for the PDF worker (caching, pooling, ...)
+# Kept separate from the parser package, which has no web dependencies
+
+from .cache import ParseCache, content_digest
+from .diff import diff_events, parse_previous
+from .encoding import COLUMNAR_MEDIA_TYPE, columnar_payload, wants_columnar
+from .jobs import JobProgress, JobQueue, JobQueueFullException
+from .memory import memory_limit, peak_rss, process_memory_limit, pss, reset_peak_rss
+from .metrics import (
+    METRICS_CONTENT_TYPE, observe_cache, observe_parse, observe_pool,
+    observe_stages, observe_startup, render_metrics,
+)
+from .pool import ParsePool, PoolSaturatedException, PoolTimeoutException
+from .profiling import ProfileStore, collapsed, pstats_text
+from .startup import StartupTimer, warm_up
+from .tasks import parse_schedule_file, profile_schedule_file
+from .upload import (
+    TooManyFilesException, UploadTooLargeException, read_upload, read_zip_pdfs,
+)
+
+__all__ = [
+    'ParseCache', 'content_digest',
+    'diff_events', 'parse_previous',
+    'COLUMNAR_MEDIA_TYPE', 'columnar_payload', 'wants_columnar',
+    'JobProgress', 'JobQueue', 'JobQueueFullException',
+    'memory_limit', 'peak_rss', 'process_memory_limit', 'pss', 'reset_peak_rss',
+    'METRICS_CONTENT_TYPE', 'observe_cache', 'observe_parse', 'observe_pool',
+    'observe_stages', 'observe_startup', 'render_metrics',
+    'ParsePool', 'PoolSaturatedException', 'PoolTimeoutException',
+    'ProfileStore', 'collapsed', 'pstats_text',
+    'StartupTimer', 'warm_up',
+    'parse_schedule_file', 'profile_schedule_file',
+    'TooManyFilesException', 'UploadTooLargeException', 'read_upload', 'read_zip_pdfs',
+]
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from parser import PARSER_VERSION
+
+
+def content_digest(content: bytes) -> str:
+    """
+    Computes the cache key digest for an uploaded PDF.
+
+    Args:
+        content: Raw upload bytes.
+
+    Returns:
+        Hex SHA-256 digest of the bytes.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+class ParseCache:
+    """
+    Two-tier cache of parse results keyed on upload content.
+
+    Identical uploads (e.g. the same faculty exam PDF uploaded by thousands
+    of students) are parsed once. The first tier is an in-process LRU; the
+    second is a directory on local disk that every gunicorn worker on the
+    machine reads and writes, so a result parsed by one worker is a hit in
+    all of them. Keys include PARSER_VERSION so a deploy that changes parser
+    output never serves stale results.
+
+    Both tiers expire entries after ttl_seconds. The memory tier holds at
+    most memory_entries results; the disk tier is trimmed oldest-first once
+    it grows past max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str],
+        memory_entries: int = 128,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = 86400,
+    ):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> 'ParseCache':
+        """
+        Builds a cache from PARSE_CACHE_* environment variables.
+
+        PARSE_CACHE_DIR (default: <tmp>/pdf-worker-cache) should point at a
+        directory every worker can write; PARSE_CACHE_DISK_MB=0 disables the
+        disk tier and PARSE_CACHE_MEMORY_ENTRIES=0 the memory tier.
+        """
+        disk_mb = int(os.getenv("PARSE_CACHE_DISK_MB", "256"))
+        directory = os.getenv(
+            "PARSE_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "pdf-worker-cache")
+        )
+        return cls(
+            directory=directory if disk_mb > 0 else None,
+            memory_entries=int(os.getenv("PARSE_CACHE_MEMORY_ENTRIES", "128")),
+            max_disk_bytes=disk_mb * 1024 * 1024,
+            ttl_seconds=int(os.getenv("PARSE_CACHE_TTL", "86400")),
+        )
+
+    def _key(self, digest: str) -> str:
+        return f"{PARSER_VERSION}-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a cached parse result.
+
+        Args:
+            digest: content_digest() of the upload.
+
+        Returns:
+            The cached {events, type} payload, or None on a miss.
+        """
+        key = self._key(digest)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return payload
+                del self._memory[key]
+
+        payload = self._read_disk(key, now)
+        with self._lock:
+            if payload is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+        self._remember(key, payload, now)
+        return payload
+
+    def put(self, digest: str, payload: Dict[str, Any]) -> None:
+        """
+        Stores a parse result in both tiers.
+
+        Args:
+            digest: content_digest() of the upload.
+            payload: The {events, type} result to cache.
+        """
+        key = self._key(digest)
+        self._remember(key, payload, time.time())
+        self._write_disk(key, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the current memory tier size."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['disk_hits']
+        counters['hit_ratio'] = hits / lookups if lookups else 0.0
+        return counters
+
+    def _remember(self, key: str, payload: Dict[str, Any], now: float) -> None:
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (now + self.ttl_seconds, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl_seconds <= now:
+                os.unlink(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing, expired by another worker, or a torn write
+            return None
+
+    def _write_disk(self, key: str, payload: Dict[str, Any]) -> None:
+        if not self.directory:
+            return
+        try:
+            # Write-then-rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        now = time.time()
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if stat.st_mtime + self.ttl_seconds <= now:
+                        self._unlink(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError:
+            return
+
+        if total <= self.max_disk_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,56 @@
+import json
+from typing import Any, Dict, List
+
+
+def parse_previous(value: str) -> Dict[str, str]:
+    """
+    Reads the `previous` fingerprints a client sends with a re-upload.
+
+    Args:
+        value: JSON object mapping event id to fingerprint, as returned
+            for each event of the earlier parse.
+
+    Returns:
+        The id to fingerprint mapping.
+
+    Raises:
+        ValueError: If the value is not a JSON object of strings
+    """
+    try:
+        previous = json.loads(value)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"previous is not valid JSON: {e}")
+    if not isinstance(previous, dict) or not all(
+        isinstance(fingerprint, str) for fingerprint in previous.values()
+    ):
+        raise ValueError("previous must be a JSON object mapping event ids to fingerprints")
+    return previous
+
+
+def diff_events(events: List[Dict[str, Any]], previous: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Compares a parse result's events with a client's earlier copy.
+
+    Args:
+        events: Events in ParsedEvent shape, with id and fingerprint.
+        previous: Event id to fingerprint from the earlier result.
+
+    Returns:
+        Dictionary with 'added' and 'changed' events, the ids of 'removed'
+        events, and the count of 'unchanged' ones.
+    """
+    added = []
+    changed = []
+    unchanged = 0
+    for event in events:
+        fingerprint = previous.get(event['id'])
+        if fingerprint is None:
+            added.append(event)
+        elif fingerprint != event['fingerprint']:
+            changed.append(event)
+        else:
+            unchanged += 1
+
+    current = {event['id'] for event in events}
+    removed = [event_id for event_id in previous if event_id not in current]
+    return {'added': added, 'changed': changed, 'removed': removed, 'unchanged': unchanged}
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+
+# Media type of the dictionary-encoded columnar /parse response
+COLUMNAR_MEDIA_TYPE = 'application/vnd.schedule.columnar+json'
+
+# String fields of the backend's ParsedEvent, in column order. Each is
+# stored as indexes into one shared string table; module codes, venues and
+# times repeat across thousands of events, and times across columns
+_STRING_COLUMNS = (
+    'module', 'activity', 'group', 'day', 'date',
+    'startTime', 'endTime', 'venue', 'semester',
+)
+
+
+def wants_columnar(accept: Optional[str]) -> bool:
+    """
+    Whether a request's Accept header asks for the columnar format.
+
+    Args:
+        accept: The Accept header, if sent.
+
+    Returns:
+        True if COLUMNAR_MEDIA_TYPE is listed without q=0.
+    """
+    if not accept:
+        return False
+    for part in accept.split(','):
+        media_type, *params = [value.strip() for value in part.split(';')]
+        if media_type.lower() != COLUMNAR_MEDIA_TYPE:
+            continue
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def columnar_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-encodes a parse result as parallel, dictionary-encoded columns.
+
+    Every string field becomes a column of indexes into `strings`, with
+    null where the event leaves an optional field out; venues, where set,
+    is a list of such indexes. isRecurring is a
+    column of booleans, and id and fingerprint are columns of plain
+    strings. Event i is rebuilt by reading index i of every column. Other
+    fields of the payload (e.g. type) are kept as they are.
+
+    Args:
+        payload: Parse result with an 'events' list in ParsedEvent shape.
+
+    Returns:
+        Dictionary with the payload's other fields plus 'count',
+        'strings' and 'columns'.
+    """
+    events = payload['events']
+    strings: List[str] = []
+    positions: Dict[str, int] = {}
+    columns: Dict[str, List[Any]] = {name: [] for name in _STRING_COLUMNS}
+
+    for name in _STRING_COLUMNS:
+        column = columns[name]
+        for event in events:
+            value = event.get(name)
+            if value is None:
+                column.append(None)
+                continue
+            position = positions.get(value)
+            if position is None:
+                position = positions[value] = len(strings)
+                strings.append(value)
+            column.append(position)
+    columns['venues'] = [
+        _string_positions(event['venues'], strings, positions)
+        if 'venues' in event else None
+        for event in events
+    ]
+    columns['isRecurring'] = [event['isRecurring'] for event in events]
+    # Unique per event, so not worth a string table entry
+    for name in ('id', 'fingerprint'):
+        columns[name] = [event.get(name) for event in events]
+
+    encoded = {key: value for key, value in payload.items() if key != 'events'}
+    encoded.update(count=len(events), strings=strings, columns=columns)
+    return encoded
+
+
+def _string_positions(values: List[str], strings: List[str], positions: Dict[str, int]) -> List[int]:
+    """Indexes of values in the string table, adding any new ones."""
+    indexes = []
+    for value in values:
+        position = positions.get(value)
+        if position is None:
+            position = positions[value] = len(strings)
+            strings.append(value)
+        indexes.append(position)
+    return indexes
@@ -0,0 +1,380 @@
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import orjson
+
+
+class JobQueueFullException(Exception):
+    """Raised when the job queue already holds its maximum of waiting jobs"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    expires REAL,
+    lease_until REAL,
+    claim TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER,
+    pages_done INTEGER,
+    digest TEXT NOT NULL,
+    options TEXT NOT NULL,
+    content BLOB,
+    result BLOB,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+
+class JobQueue:
+    """
+    Durable queue of parse jobs, for clients that should not hold a
+    connection open while a large PDF is parsed.
+
+    Jobs live in a SQLite database on local disk that every gunicorn worker
+    on the machine opens, so a job submitted to one worker can be polled
+    through any other and is run by whichever worker claims it first. Jobs
+    survive worker restarts: a job claimed by a worker that dies is claimed
+    again once its lease runs out, up to max_attempts times.
+
+    A job is 'queued', 'running', 'done' (with its result) or 'failed'
+    (with its error). Finished jobs are kept for ttl_seconds, then deleted
+    with their result; their uploaded PDF is deleted as soon as they
+    finish. At most max_queued jobs may wait; beyond that submit() raises
+    JobQueueFullException.
+
+    Each claim of a job carries a new token. A job can only be finished,
+    failed, requeued or have its progress recorded (by JobProgress) with
+    the token of its latest claim, so a worker whose lease ran out (and whose job was
+    claimed again) cannot overwrite the new claimant's result.
+
+    Jobs are reported with the machine_id of the machine whose database
+    holds them, for callers to route their polls to it.
+
+    Every call opens its own connection, so a queue can be shared between
+    threads and survives being forked.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int = 3600,
+        max_queued: int = 100,
+        max_attempts: int = 3,
+        retry_after: int = 5,
+        machine_id: Optional[str] = None,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_after = retry_after
+        self.machine_id = machine_id
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            # Readers (polls) do not block the writer, and commits need no
+            # fsync; a crash of the machine can lose the latest commits only
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> 'JobQueue':
+        """
+        Builds a queue from JOBS_* environment variables.
+
+        JOBS_DB (default: <tmp>/pdf-worker-jobs/jobs.sqlite3) should be a
+        path every worker can write, on a volume if jobs must outlive the
+        machine; JOBS_TTL seconds finished jobs are kept (default 3600),
+        JOBS_MAX_QUEUED waiting jobs (default 100), JOBS_MAX_ATTEMPTS
+        claims of one job (default 3) and the JOBS_RETRY_AFTER seconds
+        suggested when the queue is full (default 5). The machine id is
+        FLY_MACHINE_ID, which Fly.io sets; elsewhere jobs carry none.
+        """
+        return cls(
+            path=os.getenv(
+                "JOBS_DB",
+                os.path.join(tempfile.gettempdir(), "pdf-worker-jobs", "jobs.sqlite3")
+            ),
+            ttl_seconds=int(os.getenv("JOBS_TTL", "3600")),
+            max_queued=int(os.getenv("JOBS_MAX_QUEUED", "100")),
+            max_attempts=int(os.getenv("JOBS_MAX_ATTEMPTS", "3")),
+            retry_after=int(os.getenv("JOBS_RETRY_AFTER", "5")),
+            machine_id=os.getenv("FLY_MACHINE_ID") or None,
+        )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit; transactions are begun explicitly where needed
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            yield db
+        finally:
+            db.close()
+
+    def submit(self, content: bytes, digest: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queues a PDF for parsing.
+
+        Args:
+            content: The PDF's bytes.
+            digest: Their content digest.
+            options: Parse options to run the job with (JSON-serialisable).
+
+        Returns:
+            The new job, as get() returns it.
+
+        Raises:
+            JobQueueFullException: If max_queued jobs are already waiting
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                (queued,) = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+                ).fetchone()
+                if queued >= self.max_queued:
+                    raise JobQueueFullException(self.retry_after)
+                db.execute(
+                    "INSERT INTO jobs (id, status, created, digest, options, content) "
+                    "VALUES (?, 'queued', ?, ?, ?, ?)",
+                    (job_id, time.time(), digest, orjson.dumps(options).decode(), content)
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return self.get(job_id)
+
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Takes the oldest waiting job, or one whose lease has run out.
+
+        Args:
+            lease_seconds: How long the job is this caller's; it must
+                finish, fail or requeue the job by then or the job is
+                claimed again.
+
+        Returns:
+            Dictionary with the job's 'id', 'content', 'digest' and
+            'options' and the 'claim' token to finish, fail, requeue or
+            record progress with, or None if no job is waiting.
+        """
+        now = time.time()
+        claim = uuid.uuid4().hex
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose claimant died too often are given up on
+                db.execute(
+                    "UPDATE jobs SET status = 'failed', finished = ?, expires = ?, "
+                    "content = NULL, error = ? "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now + self.ttl_seconds, orjson.dumps({
+                        "statusCode": 500,
+                        "error": "Parsing failed",
+                        "details": "The job's worker stopped before finishing it",
+                    }).decode(), now, self.max_attempts)
+                )
+                row = db.execute(
+                    "SELECT id, content, digest, options FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', started = ?, lease_until = ?, "
+                        "claim = ?, attempts = attempts + 1, pages = NULL, pages_done = NULL "
+                        "WHERE id = ?",
+                        (now, now + lease_seconds, claim, row[0])
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'content': row[1],
+            'digest': row[2],
+            'options': orjson.loads(row[3]),
+            'claim': claim,
+        }
+
+    def finish(self, job_id: str, claim: str, result: Dict[str, Any]) -> bool:
+        """
+        Stores a job's result and marks it done.
+
+        Returns:
+            Whether the job was still running under this claim; if not,
+            nothing is stored.
+        """
+        now = time.time()
+        with self._connect() as db:
+            return db.execute(
+                "UPDATE jobs SET status = 'done', finished = ?, expires = ?, "
+                "content = NULL, result = ?, pages_done = pages "
+                "WHERE id = ? AND claim = ? AND status = 'running'",
+                (now, now + self.ttl_seconds, orjson.dumps(result), job_id, claim)
+            ).rowcount > 0
+
+    def fail(self, job_id: str, claim: str, status_code: int, error: Dict[str, Any]) -> bool:
+        """
+        Marks a job failed.
+
+        Args:
+            job_id: The job.
+            claim: The token claim() returned with it.
+            status_code: HTTP status a synchronous /parse would have
+                answered with.
+            error: Its error body ('error' and 'details').
+
+        Returns:
+            Whether the job was still running under this claim; if not,
+            nothing is stored.
+        """
+        now = time.time()
+        with self._connect() as db:
+            return db.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, expires = ?, "
+                "content = NULL, error = ? WHERE id = ? AND claim = ? AND status = 'running'",
+                (now, now + self.ttl_seconds,
+                 orjson.dumps({"statusCode": status_code, **error}).decode(), job_id, claim)
+            ).rowcount > 0
+
+    def requeue(self, job_id: str, claim: str) -> None:
+        """Puts a claimed job back in the queue, in its original place."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'queued', started = NULL, lease_until = NULL, "
+                "claim = NULL, attempts = MAX(attempts - 1, 0), pages = NULL, pages_done = NULL "
+                "WHERE id = ? AND claim = ? AND status = 'running'",
+                (job_id, claim)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A job's status, or None if it is unknown or expired.
+
+        Returns:
+            Dictionary with 'id', 'status', 'createdAt', 'startedAt',
+            'finishedAt' and 'expiresAt' (Unix times, or None),
+            'attempts' and 'machineId' (or None). Queued jobs add their 'position' (0 is next),
+            running jobs their 'progress' ('pagesDone' of 'pages', once the
+            page count is known), done jobs their 'result' and failed jobs
+            their 'error' ('statusCode', 'error' and 'details').
+        """
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT status, created, started, finished, expires, attempts, "
+                "pages, pages_done, result, error FROM jobs "
+                "WHERE id = ? AND (expires IS NULL OR expires > ?)",
+                (job_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            status, created, started, finished, expires, attempts, pages, pages_done, result, error = row
+            job: Dict[str, Any] = {
+                'id': job_id,
+                'status': status,
+                'createdAt': created,
+                'startedAt': started,
+                'finishedAt': finished,
+                'expiresAt': expires,
+                'attempts': attempts,
+                'machineId': self.machine_id,
+            }
+            if status == 'queued':
+                (job['position'],) = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?",
+                    (created,)
+                ).fetchone()
+        if status == 'running' and pages is not None:
+            job['progress'] = {'pagesDone': pages_done, 'pages': pages}
+        elif status == 'done':
+            job['result'] = orjson.loads(result)
+        elif status == 'failed':
+            job['error'] = orjson.loads(error)
+        return job
+
+    def purge(self) -> int:
+        """
+        Deletes expired jobs and their results.
+
+        Returns:
+            Number of jobs deleted.
+        """
+        with self._connect() as db:
+            return db.execute("DELETE FROM jobs WHERE expires <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Number of kept jobs per status."""
+        with self._connect() as db:
+            counts = dict(db.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE expires IS NULL OR expires > ? "
+                "GROUP BY status",
+                (time.time(),)
+            ).fetchall())
+        return {status: counts.get(status, 0) for status in ('queued', 'running', 'done', 'failed')}
+
+
+class JobProgress:
+    """
+    Records a running job's page progress from the pool process parsing it.
+
+    Picklable (it carries only the database path), so it can be passed
+    into the pool as parse_schedule_file()'s progress callback. Writes are
+    limited to one per min_interval seconds, and are dropped once the job
+    is no longer running under claim. A write that fails (e.g. the database
+    is locked) is dropped as well: progress is advisory, and an exception
+    here would fail the parse.
+    """
+
+    def __init__(self, path: str, job_id: str, claim: str, min_interval: float = 0.25):
+        self.path = path
+        self.job_id = job_id
+        self.claim = claim
+        self.min_interval = min_interval
+        self._written = 0.0
+
+    def __call__(self, pages_done: int, pages: int) -> None:
+        now = time.monotonic()
+        if now - self._written < self.min_interval and pages_done < pages:
+            return
+        self._written = now
+        # Only the database path crosses into the pool process, not the
+        # queue's settings. A locked database holds up the parse for at
+        # most a second
+        try:
+            db = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            try:
+                db.execute(
+                    "UPDATE jobs SET pages_done = ?, pages = ? "
+                    "WHERE id = ? AND claim = ? AND status = 'running'",
+                    (pages_done, pages, self.job_id, self.claim)
+                )
+            finally:
+                db.close()
+        except sqlite3.Error:
+            pass
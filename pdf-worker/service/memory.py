@@ -0,0 +1,112 @@
+import os
+from typing import Optional
+
+# Linux only; elsewhere every reading is None and nothing is recorded
+_SMAPS_ROLLUP = '/proc/self/smaps_rollup'
+_STATUS = '/proc/self/status'
+_CLEAR_REFS = '/proc/self/clear_refs'
+_MEMINFO = '/proc/meminfo'
+
+# The container's memory limit: cgroup v2, then v1 (which reports a huge
+# number when unlimited)
+_CGROUP_LIMITS = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+
+# Share of the machine's memory that derived per-process limits divide up;
+# the rest is headroom for parses still growing when a limit is checked
+_MEMORY_SHARE = 0.8
+
+
+def pss() -> Optional[int]:
+    """
+    This process's proportional set size in bytes, or None if unknown.
+
+    Pages shared with other processes (e.g. copy-on-write with a preloaded
+    gunicorn master) count divided by the number of processes sharing
+    them, so unlike RSS a worker is not charged for the master's modules,
+    and summed over all processes it is the memory actually in use.
+    """
+    try:
+        with open(_SMAPS_ROLLUP) as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def memory_limit() -> Optional[int]:
+    """The container's memory limit in bytes, else the machine's memory, or None."""
+    for path in _CGROUP_LIMITS:
+        try:
+            with open(path) as f:
+                limit = int(f.read())
+        except (OSError, ValueError):
+            # Missing, or 'max' (unlimited)
+            continue
+        if limit < 1 << 60:
+            return limit
+    try:
+        with open(_MEMINFO) as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def process_memory_limit(name: str, pool_workers: int, default: str = 'auto') -> int:
+    """
+    A per-process memory limit in bytes from an environment variable.
+
+    The variable holds megabytes, 0 for no limit, or 'auto':
+    the machine's memory, less headroom, divided between every process
+    the service runs, i.e. MAX_WORKERS gunicorn workers (default 1), each
+    with pool_workers parse processes, and the master.
+
+    Args:
+        name: The environment variable.
+        pool_workers: Parse pool processes per worker.
+        default: Value used when the variable is unset.
+
+    Returns:
+        The limit, or 0 for none (also when 'auto' cannot read the
+        machine's memory).
+    """
+    value = os.getenv(name, default)
+    if value != 'auto':
+        return int(value) * 1024 * 1024
+    limit = memory_limit()
+    if limit is None:
+        return 0
+    processes = int(os.getenv('MAX_WORKERS', '1')) * (1 + pool_workers) + 1
+    return int(limit * _MEMORY_SHARE / processes)
+
+
+def reset_peak_rss() -> bool:
+    """
+    Restarts this process's peak RSS (VmHWM) from its current RSS, so
+    peak_rss() covers only what runs after it.
+
+    Returns:
+        Whether the kernel supports it (Linux 4.0+).
+    """
+    try:
+        with open(_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> Optional[int]:
+    """This process's peak RSS in bytes since it started or reset_peak_rss(), or None."""
+    try:
+        with open(_STATUS) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
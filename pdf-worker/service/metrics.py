@@ -0,0 +1,156 @@
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+
+
+def _remove_metrics_dir(path: str, owner: int) -> None:
+    """Removes a lone process's metrics directory when that process exits."""
+    # Forked children inherit the handler but not the directory
+    if os.getpid() == owner:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# Every process writes its samples to this directory and /metrics sums
+# them, so parses running in pool processes and requests served by any
+# gunicorn worker are all counted. gunicorn.conf.py sets it (and clears it)
+# for the whole server; a lone process (loadtest.py, a benchmark, uvicorn)
+# gets a temporary directory of its own, which its pool processes inherit
+# and which is removed when it exits. It must be set before
+# prometheus_client is imported.
+if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    _metrics_dir = tempfile.mkdtemp(prefix='pdf-worker-metrics-')
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = _metrics_dir
+    atexit.register(_remove_metrics_dir, _metrics_dir, os.getpid())
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+
+from parser import StageTimings
+
+# Media type of the /metrics response
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# From a millisecond page up to the longest allowed parse
+_STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30, 60, 120,
+)
+
+# From a pool process's resting size to well past a small machine's memory
+_RSS_BUCKETS = tuple(megabytes * 1024 * 1024 for megabytes in (
+    32, 48, 64, 96, 128, 192, 256, 384, 512, 1024,
+))
+
+# Stages observed once per page; the others once per request, summed over
+# pages where a streamed parse records them page by page
+_PAGE_STAGES = frozenset({'extract', 'parse'})
+
+STAGE_SECONDS = Histogram(
+    'pdf_worker_stage_seconds',
+    'Seconds spent per parse stage; extract and parse are observed per page',
+    ['stage', 'type'],
+    buckets=_STAGE_BUCKETS,
+)
+PAGES = Counter('pdf_worker_pages', 'PDF pages parsed', ['type'])
+EVENTS = Counter('pdf_worker_events', 'Events returned by parses', ['type'])
+CACHE_LOOKUPS = Counter('pdf_worker_cache_lookups', 'Parse cache lookups', ['result'])
+POOL_IN_FLIGHT = Gauge(
+    'pdf_worker_pool_in_flight', 'Parse jobs admitted to the pool (running or queued)',
+    multiprocess_mode='livesum',
+)
+POOL_QUEUED = Gauge(
+    'pdf_worker_pool_queued', 'Parse jobs waiting for a pool process',
+    multiprocess_mode='livesum',
+)
+POOL_REJECTED = Counter('pdf_worker_pool_rejected', 'Parse jobs rejected by a full pool')
+POOL_RECYCLED = Counter(
+    'pdf_worker_pool_recycled', 'Parse pools replaced after a process passed PARSE_POOL_MAX_PSS_MB',
+)
+PARSE_PEAK_RSS = Histogram(
+    'pdf_worker_parse_peak_rss_bytes', 'Peak RSS of the pool process during a parse',
+    ['type'], buckets=_RSS_BUCKETS,
+)
+STARTUP_SECONDS = Gauge(
+    'pdf_worker_startup_seconds', 'Seconds per startup phase of the most recently started worker',
+    ['phase'], multiprocess_mode='livemostrecent',
+)
+
+
+def observe_stages(timings: StageTimings, pdf_type: str) -> None:
+    """Records a request's stage durations, labelled with its PDF type."""
+    for stage, durations in timings.stages.items():
+        histogram = STAGE_SECONDS.labels(stage, pdf_type)
+        if stage in _PAGE_STAGES:
+            for seconds in durations:
+                histogram.observe(seconds)
+        else:
+            histogram.observe(sum(durations))
+
+
+def observe_parse(
+    timings: StageTimings,
+    pdf_type: str,
+    pages: int,
+    events: int,
+    peak_rss: Optional[int] = None,
+) -> None:
+    """
+    Records a finished parse.
+
+    Args:
+        timings: Durations the parse recorded.
+        pdf_type: The parsed PDF's type, used as the 'type' label.
+        pages: Pages in the PDF.
+        events: Events in the result.
+        peak_rss: Peak RSS in bytes of the process during the parse, if
+            measured.
+    """
+    observe_stages(timings, pdf_type)
+    PAGES.labels(pdf_type).inc(pages)
+    EVENTS.labels(pdf_type).inc(events)
+    if peak_rss is not None:
+        PARSE_PEAK_RSS.labels(pdf_type).observe(peak_rss)
+
+
+def observe_cache(hit: bool) -> None:
+    """Records one parse cache lookup."""
+    CACHE_LOOKUPS.labels('hit' if hit else 'miss').inc()
+
+
+def observe_pool(stats: Dict[str, int], rejected: bool = False, recycled: bool = False) -> None:
+    """
+    Publishes a ParsePool's admission counters.
+
+    Args:
+        stats: ParsePool.stats() after the change.
+        rejected: Whether the change was a rejected job.
+        recycled: Whether the change was the pool being recycled.
+    """
+    POOL_IN_FLIGHT.set(stats['in_flight'])
+    POOL_QUEUED.set(stats['queued'])
+    if rejected:
+        POOL_REJECTED.inc()
+    if recycled:
+        POOL_RECYCLED.inc()
+
+
+def observe_startup(phases: Dict[str, float]) -> None:
+    """Publishes a worker's startup phases (StartupTimer.phases)."""
+    for phase, seconds in phases.items():
+        STARTUP_SECONDS.labels(phase).set(seconds)
+
+
+def render_metrics() -> bytes:
+    """
+    Renders every process's metrics in the Prometheus text format.
+
+    Returns:
+        The /metrics response body.
+    """
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
@@ -0,0 +1,334 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .memory import process_memory_limit, pss
+
+
+class PoolSaturatedException(Exception):
+    """Raised when the parse pool's admission queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Parse queue is full")
+        self.retry_after = retry_after
+
+
+class PoolTimeoutException(Exception):
+    """Raised when a pool job overruns its time limit and is killed"""
+    pass
+
+
+class ParsePool:
+    """
+    Bounded process pool that runs blocking parse work off the event loop.
+
+    PDF parsing is CPU-bound; running it in the uvicorn worker would block
+    the event loop (including /health) for the whole parse. Work submitted
+    here runs in `workers` separate processes. At most `workers` jobs run
+    and `queue_size` more wait; anything beyond that is rejected at once
+    with PoolSaturatedException, so overload turns into fast 503s instead
+    of requests piling up until the gunicorn timeout kills them.
+
+    Jobs given a timeout are hard-limited: if one has been running in its
+    process for longer, the pool processes are killed and replaced. This is
+    the backstop for work stuck where cooperative deadline checks cannot
+    reach. A job whose timeout expires while it still waits for a process
+    is dropped without touching the jobs that are running.
+
+    With max_pss set, a pool process whose PSS is above it after a job
+    retires the pool: jobs already on it finish there, and later jobs start
+    fresh processes, forked from this (warm) worker. Memory that parsing
+    leaves fragmented or cached is returned that way, without restarting
+    the worker or recycling processes that stay small.
+
+    The executor is created on first use so that it is started inside each
+    gunicorn worker rather than inherited from the master.
+
+    If given, on_change(stats(), rejected, recycled) is called after every
+    admission, release, rejection and recycle, e.g. to publish the counters
+    as metrics.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = 4,
+        retry_after: int = 5,
+        max_pss: int = 0,
+        on_change: Optional[Callable[[Dict[str, int], bool, bool], None]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self.max_pss = max(0, max_pss)
+        self.on_change = on_change
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Shared with the pool processes once the first executor starts: per
+        # job slot, the id of the job that holds it and when the job started
+        # running (0 while it waits); see _run_job()
+        self._job_states: Optional[Any] = None
+        self._free_slots: List[int] = []
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._recycled = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        on_change: Optional[Callable[[Dict[str, int], bool, bool], None]] = None,
+    ) -> 'ParsePool':
+        """
+        Builds a pool from PARSE_POOL_* environment variables.
+
+        PARSE_POOL_WORKERS processes per gunicorn worker (default 1),
+        PARSE_POOL_QUEUE_SIZE waiting jobs (default 4), the
+        PARSE_POOL_RETRY_AFTER seconds suggested to rejected clients
+        (default 5) and the PARSE_POOL_MAX_PSS_MB a process may use after a
+        job before the pool is recycled (default 'auto', a share of the
+        machine's memory, see process_memory_limit(); 0 never recycles).
+        """
+        workers = int(os.getenv("PARSE_POOL_WORKERS", "1"))
+        return cls(
+            workers=workers,
+            queue_size=int(os.getenv("PARSE_POOL_QUEUE_SIZE", "4")),
+            retry_after=int(os.getenv("PARSE_POOL_RETRY_AFTER", "5")),
+            max_pss=process_memory_limit("PARSE_POOL_MAX_PSS_MB", workers),
+            on_change=on_change,
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of admitted jobs (running plus waiting)."""
+        return self.workers + self.queue_size
+
+    @property
+    def idle(self) -> int:
+        """Number of processes no admitted job is running on."""
+        with self._lock:
+            return max(0, self.workers - self._in_flight)
+
+    def acquire(self) -> None:
+        """
+        Admits one job, or rejects it if the pool is at capacity.
+
+        Every successful acquire() must be paired with release(). Use this
+        directly for work that runs outside the pool but should still count
+        against it (e.g. streaming parses); otherwise prefer run().
+
+        Raises:
+            PoolSaturatedException: If capacity jobs are already admitted
+        """
+        with self._lock:
+            rejected = self._in_flight >= self.capacity
+            if rejected:
+                self._rejected += 1
+            else:
+                self._in_flight += 1
+        self._changed(rejected)
+        if rejected:
+            raise PoolSaturatedException(self.retry_after)
+
+    def release(self) -> None:
+        """Frees the admission slot taken by acquire()."""
+        with self._lock:
+            self._in_flight -= 1
+        self._changed(False)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Runs fn(*args) in a pool process and awaits its result.
+
+        Args:
+            fn: Module-level (picklable) function to run.
+            *args: Picklable arguments for fn.
+            timeout: Seconds the job may run in its process before the
+                pool is killed, and may wait for a process before it is
+                dropped. None waits indefinitely.
+
+        Returns:
+            fn's return value. Exceptions raised by fn are re-raised here.
+
+        Raises:
+            PoolSaturatedException: If the pool is at capacity, or the job
+                was lost with a pool that was killed or shut down
+            PoolTimeoutException: If the job was killed for overrunning, or
+                waited too long for a process
+        """
+        self.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            with self._lock:
+                slot = self._free_slots.pop()
+            job = next(self._job_ids)
+            with self._job_states.get_lock():
+                self._job_states[2 * slot] = job
+                self._job_states[2 * slot + 1] = 0
+            future = loop.run_in_executor(
+                executor, _run_job, slot, job, bool(self.max_pss), fn, *args
+            )
+            try:
+                result, process_pss = await self._wait(future, executor, slot, timeout)
+                if process_pss is not None and process_pss > self.max_pss:
+                    self._recycle_executor(executor)
+                return result
+            except BrokenProcessPool:
+                # A pool process died (e.g. OOM-killed); start a fresh pool
+                # for the next job and report this one as retryable
+                self._reset_executor(executor)
+                raise PoolSaturatedException(self.retry_after)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    # The caller itself was cancelled; a job still waiting
+                    # for a process is dropped
+                    self._drop_waiting(future, slot)
+                    raise
+                # The job was still queued on a pool that was killed or
+                # shut down and cancelled its waiting jobs; retryable too
+                raise PoolSaturatedException(self.retry_after)
+            finally:
+                with self._lock:
+                    self._free_slots.append(slot)
+        finally:
+            self.release()
+
+    async def _wait(
+        self,
+        future: 'asyncio.Future[Any]',
+        executor: ProcessPoolExecutor,
+        slot: int,
+        timeout: Optional[float],
+    ) -> Any:
+        """Awaits a job's result, timing it from when it starts running."""
+        if timeout is None:
+            return await future
+        remaining = timeout
+        while True:
+            done, _ = await asyncio.wait((future,), timeout=max(0.0, remaining))
+            if done:
+                return future.result()
+            if self._drop_waiting(future, slot):
+                raise PoolTimeoutException(
+                    f"Timed out after {timeout:g} seconds waiting for a parse process"
+                )
+            started = self._job_states[2 * slot + 1]
+            remaining = started + timeout - time.monotonic()
+            if remaining <= 0:
+                # The process is stuck; the only way to stop it is to kill it
+                future.cancel()
+                self._kill_executor(executor)
+                raise PoolTimeoutException(
+                    f"Operation timed out after {timeout:g} seconds"
+                )
+
+    def _drop_waiting(self, future: 'asyncio.Future[Any]', slot: int) -> bool:
+        """Drops a job that has not started running; returns whether it had not."""
+        with self._job_states.get_lock():
+            if self._job_states[2 * slot + 1]:
+                return False
+            # A process that picks the job up anyway skips it (_run_job)
+            self._job_states[2 * slot] = 0
+        future.cancel()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Returns current admission counters."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'in_flight': self._in_flight,
+                'queued': max(0, self._in_flight - self.workers),
+                'rejected': self._rejected,
+                'recycled': self._recycled,
+            }
+
+    def shutdown(self) -> None:
+        """Stops the pool processes, waiting for running jobs."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _changed(self, rejected: bool, recycled: bool = False) -> None:
+        if self.on_change is not None:
+            self.on_change(self.stats(), rejected, recycled)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._job_states is None:
+                # Two doubles per admitted job: its id and its start time
+                self._job_states = multiprocessing.Array('d', 2 * self.capacity)
+                self._free_slots = list(range(self.capacity))
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_process,
+                    initargs=(self._job_states,),
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Concurrent jobs on the same broken pool only replace it once
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle_executor(self, bloated: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # Concurrent jobs finishing on the same pool only recycle it once
+            if self._executor is not bloated:
+                return
+            self._executor = None
+            self._recycled += 1
+        # Jobs already submitted still run; its processes exit after them
+        bloated.shutdown(wait=False)
+        self._changed(False, recycled=True)
+
+    def _kill_executor(self, executor: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor cannot cancel a running job, and breaks as a
+        # whole when one of its processes dies, so every process of the pool
+        # is killed. Other jobs running or queued on it fail with a
+        # retryable 503.
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        self._reset_executor(executor)
+
+
+# The pool's job slots, in a pool process (see ParsePool._get_executor)
+_job_states: Optional[Any] = None
+
+
+def _init_process(job_states: Any) -> None:
+    """Keeps the pool's job slots, which can only be passed to a process as it starts."""
+    global _job_states
+    _job_states = job_states
+
+
+def _run_job(
+    slot: int, job: int, measure: bool, fn: Callable[..., Any], *args: Any
+) -> Tuple[Any, Optional[int]]:
+    """
+    Runs fn(*args) in a pool process, recording when it starts in its slot.
+
+    Returns:
+        fn's result and, if measure is set, the process's PSS after it.
+        A job dropped while it waited (its slot no longer holds it) is not
+        run, and returns (None, None).
+    """
+    with _job_states.get_lock():
+        if _job_states[2 * slot] != job:
+            return None, None
+        _job_states[2 * slot + 1] = time.monotonic()
+    result = fn(*args)
+    return result, pss() if measure else None
@@ -0,0 +1,352 @@
+import hmac
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Interval of the stack samples taken during a profiled parse; the
+# sampling thread cannot run more often than the interpreter's 5ms GIL
+# switch interval while the parse holds the GIL
+REQUEST_SAMPLE_INTERVAL = 0.005
+
+# Distinct stacks kept in the aggregate flame graph; further stacks are
+# counted under one overflow entry so the aggregate cannot grow unbounded
+_MAX_STACKS = 10000
+_OVERFLOW_STACK = '[other stacks]'
+
+# File names in the shared profile directory: one file per kept profile,
+# one per worker holding its share of the flame graph, and the marker
+# whose mtime is the flame graph's last reset
+_PROFILE_SUFFIX = '.profile'
+_STACKS_PREFIX = 'stacks-'
+_RESET_MARKER = 'stacks.reset'
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread.
+
+    Every `interval` seconds the target thread's current frame is read
+    from sys._current_frames() and its call chain counted as one collapsed
+    stack ("outer;...;inner"), the input format of flamegraph.pl and
+    speedscope. The target thread is never traced, so its cost is the
+    sampling thread's share of the GIL.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target = 0
+
+    def start(self) -> None:
+        """Starts sampling the calling thread."""
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """
+        Stops sampling.
+
+        Returns:
+            Sample count per collapsed stack.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return dict(self.counts)
+
+    def _run(self) -> None:
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                self.counts[';'.join(stack)] += 1
+
+    def _label(self, code: Any) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+        return label
+
+
+def profile_result(profiler: Any, stacks: Optional[Dict[str, int]], seconds: float) -> Dict[str, Any]:
+    """
+    Packs a finished profile for the trip back from a pool process.
+
+    Args:
+        profiler: The disabled cProfile.Profile, or None.
+        stacks: StackSampler.stop()'s counts, or None.
+        seconds: Wall-clock seconds of the profiled parse.
+
+    Returns:
+        Picklable dictionary with 'pstats' (pstats file bytes, as
+        Profile.dump_stats() writes) and 'stacks', each None if not taken,
+        and 'seconds'.
+    """
+    data = None
+    if profiler is not None:
+        profiler.create_stats()
+        data = marshal.dumps(profiler.stats)
+    return {'pstats': data, 'stacks': stacks, 'seconds': seconds}
+
+
+class _LoadedStats:
+    """A profile's stats table in the shape pstats.Stats() loads from."""
+
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileStore:
+    """
+    Decides which parses to profile and keeps the results.
+
+    A parse is profiled (with cProfile, plus fine stack samples) when a
+    request carrying the profiling token asks for it or, at `rate`, at
+    random. With `sample_interval` set, every other parse is stack-sampled
+    at that interval and the samples are added to one aggregate flame
+    graph.
+
+    Profiles and the flame graph live in a directory every gunicorn worker
+    on the machine reads and writes, so any worker can serve a profile
+    taken by another. The newest `buffer_size` profiles are kept. Each
+    worker writes its share of the flame graph to its own file, and
+    reading it sums them.
+
+    Without a token, requests cannot ask for profiles and the /profiles
+    endpoints are off. Nothing could read rate-triggered profiles or the
+    flame graph then, so rate and sample_interval are ignored and parses
+    run unprofiled through the normal task.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        buffer_size: int = 16,
+        rate: float = 0.0,
+        sample_interval: float = 0.0,
+        token: Optional[str] = None,
+    ):
+        self.directory = directory
+        self.buffer_size = max(1, buffer_size)
+        self.token = token or None
+        self.rate = rate if self.token is not None else 0.0
+        self.sample_interval = sample_interval if self.token is not None else 0.0
+        self._stacks: Counter = Counter()
+        self._stacks_reset = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> 'ProfileStore':
+        """
+        Builds a store from PROFILE_* environment variables.
+
+        PROFILE_TOKEN enables requested profiles and the /profiles
+        endpoints for callers sending it (default unset, off),
+        PROFILE_DIR is the shared directory (default:
+        <tmp>/pdf-worker-profiles), PROFILE_BUFFER_SIZE profiles are kept
+        (default 16), PROFILE_RATE is the fraction of parses profiled
+        without being asked (default 0) and PROFILE_SAMPLE_INTERVAL_MS the
+        time between aggregate stack samples (default 0, off). Both need
+        PROFILE_TOKEN, as only /profiles reads what they record.
+        """
+        return cls(
+            directory=os.getenv(
+                "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "pdf-worker-profiles")
+            ),
+            buffer_size=int(os.getenv("PROFILE_BUFFER_SIZE", "16")),
+            rate=float(os.getenv("PROFILE_RATE", "0")),
+            sample_interval=float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "0")) / 1000,
+            token=os.getenv("PROFILE_TOKEN"),
+        )
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """Whether a caller's token matches the profiling token (never if unset)."""
+        if self.token is None or token is None:
+            return False
+        return hmac.compare_digest(token.encode(), self.token.encode())
+
+    def should_profile(self, requested: bool) -> Optional[str]:
+        """
+        Decides whether to profile a parse.
+
+        Args:
+            requested: Whether an authorized request asked for a profile.
+
+        Returns:
+            What triggered the profile ('request' or 'rate'), or None.
+        """
+        if requested:
+            return 'request'
+        if self.rate > 0 and random.random() < self.rate:
+            return 'rate'
+        return None
+
+    def add(self, result: Dict[str, Any], trigger: str, pdf_type: str, digest: str) -> str:
+        """
+        Keeps a profiled parse's result, evicting the oldest if full.
+
+        Args:
+            result: profile_result() of the parse.
+            trigger: What triggered it (see should_profile()).
+            pdf_type: Type of the parsed PDF.
+            digest: Content digest of the PDF.
+
+        Returns:
+            The profile's id.
+        """
+        profile_id = uuid.uuid4().hex[:12]
+        entry = {
+            'id': profile_id,
+            'created': time.time(),
+            'trigger': trigger,
+            'type': pdf_type,
+            'digest': digest,
+            'seconds': result['seconds'],
+            'samples': sum((result['stacks'] or {}).values()),
+            'result': result,
+        }
+        self._write(f"{profile_id}{_PROFILE_SUFFIX}", entry)
+        self._evict()
+        return profile_id
+
+    def add_samples(self, stacks: Dict[str, int]) -> None:
+        """Adds a sampled parse's stacks to the aggregate flame graph."""
+        with self._lock:
+            reset = self._mtime(_RESET_MARKER)
+            if reset > self._stacks_reset:
+                # Another worker reset the flame graph
+                self._stacks.clear()
+                self._stacks_reset = reset
+            for stack, count in stacks.items():
+                if stack in self._stacks or len(self._stacks) < _MAX_STACKS:
+                    self._stacks[stack] += count
+                else:
+                    self._stacks[_OVERFLOW_STACK] += count
+            self._write(f"{_STACKS_PREFIX}{os.getpid()}", dict(self._stacks))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Kept profiles' details, newest first."""
+        entries = [self._read(name) for _, name in reversed(self._profile_files())]
+        return [
+            {key: value for key, value in entry.items() if key != 'result'}
+            for entry in entries if entry is not None
+        ]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """A kept profile by id, or None if unknown or evicted."""
+        if not profile_id.isalnum():
+            return None
+        return self._read(f"{profile_id}{_PROFILE_SUFFIX}")
+
+    def flamegraph(self) -> str:
+        """The aggregate samples as collapsed stacks, one "stack count" per line."""
+        total: Counter = Counter()
+        for name in self._names():
+            if name.startswith(_STACKS_PREFIX):
+                total.update(self._read(name) or {})
+        return collapsed(dict(total))
+
+    def reset_flamegraph(self) -> None:
+        """Discards the aggregate samples of every worker."""
+        with self._lock:
+            self._stacks.clear()
+            # Workers still holding samples drop them before adding more
+            with open(os.path.join(self.directory, _RESET_MARKER), 'w'):
+                pass
+            self._stacks_reset = self._mtime(_RESET_MARKER)
+            for name in self._names():
+                if name.startswith(_STACKS_PREFIX):
+                    self._unlink(name)
+
+    def _names(self) -> List[str]:
+        try:
+            return os.listdir(self.directory)
+        except OSError:
+            return []
+
+    def _profile_files(self) -> List[Tuple[float, str]]:
+        """(mtime, name) of the kept profiles, oldest first."""
+        files = []
+        for name in self._names():
+            if name.endswith(_PROFILE_SUFFIX):
+                mtime = self._mtime(name)
+                if mtime:
+                    files.append((mtime, name))
+        return sorted(files)
+
+    def _evict(self) -> None:
+        files = self._profile_files()
+        for _, name in files[:max(0, len(files) - self.buffer_size)]:
+            self._unlink(name)
+
+    def _mtime(self, name: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self.directory, name))
+        except OSError:
+            return 0.0
+
+    def _read(self, name: str) -> Optional[Any]:
+        try:
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            # Missing, evicted by another worker, or a torn write
+            return None
+
+    def _write(self, name: str, value: Any) -> None:
+        try:
+            # Write-then-rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(value, f)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def _unlink(self, name: str) -> None:
+        try:
+            os.unlink(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+
+def collapsed(stacks: Dict[str, int]) -> str:
+    """Formats stack counts as collapsed stack lines, heaviest first."""
+    lines = sorted(stacks.items(), key=lambda item: item[1], reverse=True)
+    return ''.join(f"{stack} {count}\n" for stack, count in lines)
+
+
+def pstats_text(data: bytes, limit: int = 40) -> str:
+    """
+    Renders a pstats dump as pstats' text report.
+
+    Args:
+        data: pstats file bytes, from profile_result().
+        limit: Functions listed, by cumulative time.
+    """
+    stream = io.StringIO()
+    stats = pstats.Stats(_LoadedStats(marshal.loads(data)), stream=stream)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
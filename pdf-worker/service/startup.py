@@ -0,0 +1,105 @@
+import glob
+import os
+import time
+from typing import Any, Dict, Optional
+
+from parser import EventIndex, parse_pdf, process_events
+
+
+def warm_up(directory: str, engine: str = 'auto', backend: str = 'pdfplumber') -> Dict[str, Any]:
+    """
+    Parses every PDF in a directory once, in this process.
+
+    The first parse in a process loads what later parses reuse (pdfminer's
+    font and CMap tables, lazily imported modules, learned table
+    templates). Run before forking, it leaves all of that in pages the
+    children share. Nothing is cached or recorded to the metrics, and the
+    parse pool is not started.
+
+    Args:
+        directory: Directory of PDFs; a missing one warms nothing.
+        engine: Table extraction engine the service parses with.
+        backend: PDF library the service parses with.
+
+    Returns:
+        Dictionary with the 'files' parsed, how many 'failed' and the
+        'seconds' it took.
+    """
+    start = time.perf_counter()
+    files = sorted(glob.glob(os.path.join(directory, '*.pdf')))
+    failed = 0
+    for path in files:
+        try:
+            result = parse_pdf(path, engine=engine, backend=backend)
+            for event in process_events(result['events'], EventIndex()):
+                event.to_dict()
+        except Exception:
+            # An unparseable PDF warms the error path just as well
+            failed += 1
+    return {'files': len(files), 'failed': failed, 'seconds': time.perf_counter() - start}
+
+
+class StartupTimer:
+    """
+    Times how long a worker process took to start serving.
+
+    Created when the app module has been imported, with the time its
+    import began. A worker forked from a gunicorn master that preloaded
+    the app inherits the timer and starts its clock at the fork instead;
+    the import and warm-up it reports are then the master's.
+
+    Phases, in seconds:
+        import: Importing the app module.
+        warmup: warm_up() before serving, 0 if skipped.
+        ready: From the process's start (its import, or its fork) until
+            the server started it.
+        first_request: From the same start until its first parse request
+            was answered.
+    """
+
+    def __init__(self, import_started: float):
+        self.started = import_started
+        self.preloaded = False
+        self.phases: Dict[str, float] = {
+            'import': time.perf_counter() - import_started,
+            'warmup': 0.0,
+        }
+        self.warmup: Optional[Dict[str, Any]] = None
+        os.register_at_fork(after_in_child=self._forked)
+
+    def _forked(self) -> None:
+        self.started = time.perf_counter()
+        self.preloaded = True
+        self.phases.pop('ready', None)
+        self.phases.pop('first_request', None)
+
+    def warm_up(self, directory: str, engine: str = 'auto', backend: str = 'pdfplumber') -> None:
+        """Runs warm_up() and records its duration."""
+        self.warmup = warm_up(directory, engine, backend)
+        self.phases['warmup'] = self.warmup['seconds']
+
+    def ready(self) -> None:
+        """Marks the server starting the app in this process."""
+        self.phases.setdefault('ready', time.perf_counter() - self.started)
+
+    def first_request(self) -> bool:
+        """
+        Marks a parse request answered.
+
+        Returns:
+            True the first time in this process, when the phases are
+            complete and worth publishing.
+        """
+        if 'first_request' in self.phases:
+            return False
+        self.phases['first_request'] = time.perf_counter() - self.started
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Phases so far, whether the app was preloaded, and the warm-up."""
+        return {
+            'pid': os.getpid(),
+            'preloaded': self.preloaded,
+            'seconds': dict(self.phases),
+            'warmup': self.warmup,
+        }
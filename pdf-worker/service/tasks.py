@@ -0,0 +1,113 @@
+import cProfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from parser import Deadline, EventIndex, StageTimings, parse_pdf, process_events
+from parser.document import PDFSource
+from parser.parallel import PARALLEL_MIN_PAGES
+
+from .memory import peak_rss, reset_peak_rss
+from .metrics import observe_parse
+from .profiling import REQUEST_SAMPLE_INTERVAL, StackSampler, profile_result
+
+
+def parse_schedule_file(
+    source: PDFSource,
+    deadline: Optional[Deadline] = None,
+    extract_workers: int = 1,
+    parallel_min_pages: int = PARALLEL_MIN_PAGES,
+    pdf_type: Optional[str] = None,
+    engine: str = 'auto',
+    backend: str = 'pdfplumber',
+    merge_venues: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Parses a schedule PDF and cleans its events.
+
+    Runs inside a ParsePool process, so it must stay a module-level
+    function with picklable arguments and return value. Stage timings,
+    counts and the process's peak RSS during the parse (it runs one parse
+    at a time) are recorded to the metrics from here.
+
+    Args:
+        source: The PDF's bytes or path (file objects cannot be sent to
+            a pool process).
+        deadline: Caller's deadline, checked cooperatively while parsing.
+        extract_workers: Processes for parallel page extraction (1 = off).
+        parallel_min_pages: Page count from which extraction fans out.
+        pdf_type: Type declared by the caller, or None to detect it.
+        engine: Table extraction engine ('auto', 'tables' or 'words').
+        backend: PDF library to parse with ('pdfplumber' or 'pymupdf').
+        merge_venues: Merge events that differ only in venue into one
+            event with a venue list.
+        progress: Called with (pages parsed, page count) as pages are
+            parsed; must be picklable.
+
+    Returns:
+        Dictionary with 'events' (processed, in the backend's ParsedEvent
+        shape) and 'type' fields.
+
+    Raises:
+        ValueError: If the PDF cannot be parsed
+    """
+    measured = reset_peak_rss()
+    timings = StageTimings()
+    result = parse_pdf(
+        source, deadline, extract_workers, parallel_min_pages, pdf_type, engine,
+        backend, timings, progress
+    )
+    with timings.time('process_events'):
+        events = process_events(result['events'], EventIndex(merge_venues))
+    with timings.time('serialize'):
+        serialized = [event.to_dict() for event in events]
+    observe_parse(
+        timings, result['type'], result['pages'], len(serialized),
+        peak_rss() if measured else None
+    )
+    return {
+        "events": serialized,
+        "type": result['type']
+    }
+
+
+def profile_schedule_file(
+    profile: bool,
+    sample_interval: float,
+    *args: Any,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Runs parse_schedule_file() under the profiler and/or stack sampler.
+
+    Runs inside a ParsePool process like parse_schedule_file(); the
+    profile travels back with the result.
+
+    Args:
+        profile: Profile the parse with cProfile, with stack samples every
+            REQUEST_SAMPLE_INTERVAL seconds.
+        sample_interval: Otherwise, seconds between stack samples (0 for
+            none).
+        *args: parse_schedule_file()'s arguments.
+
+    Returns:
+        Tuple of parse_schedule_file()'s result and profile_result().
+
+    Raises:
+        ValueError: If the PDF cannot be parsed
+    """
+    interval = REQUEST_SAMPLE_INTERVAL if profile else sample_interval
+    sampler = StackSampler(interval) if interval > 0 else None
+    profiler = cProfile.Profile() if profile else None
+
+    start = time.perf_counter()
+    if sampler is not None:
+        sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        payload = parse_schedule_file(*args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        stacks = sampler.stop() if sampler is not None else None
+    return payload, profile_result(profiler, stacks, time.perf_counter() - start)
@@ -0,0 +1,138 @@
+import hashlib
+import io
+import zipfile
+from typing import List, Optional, Tuple
+
+from fastapi import UploadFile
+
+# Bytes read from the upload per await; keeps hashing interleaved with I/O
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeException(Exception):
+    """Raised when an upload exceeds the configured byte limit"""
+
+    def __init__(self, max_bytes: int, message: Optional[str] = None):
+        super().__init__(
+            message or f"File exceeds maximum size of {max_bytes} bytes"
+        )
+        self.max_bytes = max_bytes
+
+
+class TooManyFilesException(Exception):
+    """Raised when an archive holds more PDFs than the caller allows"""
+
+    def __init__(self, max_files: int):
+        super().__init__(f"Archive contains more than {max_files} PDFs")
+        self.max_files = max_files
+
+
+async def read_upload(file: UploadFile, max_bytes: int) -> Tuple[bytes, str]:
+    """
+    Reads an uploaded PDF into memory in chunks.
+
+    The upload is never written to a file of our own: Starlette has already
+    spooled it (in memory, or on disk only past its spool size), and the
+    parser works from the returned bytes directly. The SHA-256 used as the
+    parse-cache key is computed while reading, and reading stops as soon as
+    max_bytes is exceeded.
+
+    Args:
+        file: The multipart upload.
+        max_bytes: Largest upload accepted.
+
+    Returns:
+        Tuple of the upload bytes and their hex SHA-256 digest.
+
+    Raises:
+        UploadTooLargeException: If the upload exceeds max_bytes
+    """
+    # Starlette knows the spooled size up front; reject without reading
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeException(max_bytes)
+
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(buffer) + len(chunk) > max_bytes:
+            raise UploadTooLargeException(max_bytes)
+        digest.update(chunk)
+        buffer += chunk
+
+    return bytes(buffer), digest.hexdigest()
+
+
+def read_zip_pdfs(
+    content: bytes,
+    max_bytes: int,
+    max_files: Optional[int] = None,
+    max_total_bytes: Optional[int] = None,
+) -> List[Tuple[str, bytes]]:
+    """
+    Extracts the PDFs from a zip archive held in memory.
+
+    Directories, macOS resource forks and non-PDF members are skipped.
+    Each member's size is checked against max_bytes, and the running total
+    against max_total_bytes, both from the archive directory and while
+    decompressing, so a zip bomb cannot expand past either. Counting stops
+    at the first PDF past max_files, before it is decompressed.
+
+    Args:
+        content: The zip archive's bytes.
+        max_bytes: Largest PDF accepted from the archive.
+        max_files: Most PDFs accepted from the archive, or None for any.
+        max_total_bytes: Most decompressed bytes accepted from the
+            archive's PDFs together, or None for no limit.
+
+    Returns:
+        List of (member name, PDF bytes) in archive order.
+
+    Raises:
+        UploadTooLargeException: If any PDF member exceeds max_bytes, or
+            all of them max_total_bytes
+        TooManyFilesException: If there are more than max_files PDFs
+        ValueError: If the archive is corrupt
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            members = []
+            total = 0
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith('__MACOSX/'):
+                    continue
+                if not name.lower().endswith('.pdf'):
+                    continue
+                if max_files is not None and len(members) >= max_files:
+                    raise TooManyFilesException(max_files)
+                # Declared sizes can lie; both limits are enforced again on
+                # the bytes actually decompressed
+                limit = max_bytes
+                if max_total_bytes is not None:
+                    limit = min(limit, max_total_bytes - total)
+                if info.file_size > limit:
+                    raise _member_too_large(max_bytes, max_total_bytes, info.file_size)
+                with archive.open(info) as member:
+                    data = member.read(limit + 1)
+                if len(data) > limit:
+                    raise _member_too_large(max_bytes, max_total_bytes, len(data))
+                total += len(data)
+                members.append((name, data))
+            return members
+    except zipfile.BadZipFile as e:
+        raise ValueError(str(e))
+
+
+def _member_too_large(
+    max_bytes: int, max_total_bytes: Optional[int], size: int
+) -> UploadTooLargeException:
+    """The exception for a zip member that broke the per-file or the total limit."""
+    if size > max_bytes or max_total_bytes is None:
+        return UploadTooLargeException(max_bytes)
+    return UploadTooLargeException(
+        max_total_bytes,
+        f"PDFs in the archive exceed the {max_total_bytes} bytes left for the batch's archives"
+    )
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Differential check of the word-position extraction engine and PDF backends.
+
+Extracts every page of each PDF with both engines -- pdfplumber's
+extract_tables() and parser.words.extract_word_tables() -- and reports
+any page where the word engine's tables differ. Pages the word engine
+declines (no single full grid) are listed but are not failures: in
+production they fall back to extract_tables().
+
+When pymupdf is installed, each PDF is also parsed end to end with the
+pymupdf backend and its events compared with the pdfplumber backend's.
+
+Usage:
+    python verify_engines.py [PDF ...]
+
+Without arguments, checks ../SourceFiles/*.pdf and fixtures/*.pdf.
+"""
+
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from parser.document import PDFDocument
+from parser.mupdf import pymupdf
+from parser.pdf_parser import parse_pdf
+from parser.words import extract_word_tables
+
+
+def verify_pdf(path):
+    """Compares both engines on every page of one PDF."""
+    mismatched = []
+    declined = []
+    tables_seconds = 0.0
+    words_seconds = 0.0
+
+    with PDFDocument.open(path) as document:
+        for index, page in enumerate(document.pages):
+            # Lay the page out once so both timings cover extraction only
+            page.chars
+
+            start = time.perf_counter()
+            expected = page.extract_tables()
+            tables_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = extract_word_tables(page)
+            words_seconds += time.perf_counter() - start
+
+            if actual is None:
+                declined.append(index + 1)
+            elif actual != expected:
+                mismatched.append(index + 1)
+            document.release_page(index)
+
+    name = os.path.basename(path)
+    timing = f"tables {tables_seconds * 1000:.0f}ms, words {words_seconds * 1000:.0f}ms"
+    if mismatched:
+        print(f"✗ {name}: tables differ on pages {mismatched} ({timing})")
+    else:
+        print(f"✓ {name}: identical ({timing})")
+    if declined:
+        print(f"    word engine declined pages {declined}; extract_tables() is used there")
+    return not mismatched
+
+
+def verify_backends(path):
+    """Compares the events parsed with each PDF backend."""
+    results = {}
+    for backend in ('pdfplumber', 'pymupdf'):
+        start = time.perf_counter()
+        try:
+            results[backend] = parse_pdf(path, backend=backend)
+        except ValueError as e:
+            # Unparseable PDFs must fail the same way on both
+            results[backend] = str(e)
+        results[backend + '_seconds'] = time.perf_counter() - start
+
+    name = os.path.basename(path)
+    timing = (
+        f"pdfplumber {results['pdfplumber_seconds'] * 1000:.0f}ms, "
+        f"pymupdf {results['pymupdf_seconds'] * 1000:.0f}ms"
+    )
+    if results['pdfplumber'] != results['pymupdf']:
+        print(f"✗ {name}: events differ ({timing})")
+        return False
+    print(f"✓ {name}: identical events ({timing})")
+    return True
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    paths = sys.argv[1:] or (
+        sorted(glob.glob(os.path.join(here, '..', 'SourceFiles', '*.pdf')))
+        + sorted(glob.glob(os.path.join(here, 'fixtures', '*.pdf')))
+    )
+    if not paths:
+        print("No PDFs to check")
+        return 1
+
+    print("=" * 60)
+    print("VERIFYING WORD ENGINE AGAINST extract_tables()")
+    print("=" * 60)
+
+    results = [verify_pdf(path) for path in paths]
+
+    print("=" * 60)
+    print("VERIFYING PYMUPDF BACKEND AGAINST PDFPLUMBER")
+    print("=" * 60)
+
+    if pymupdf is None:
+        print("pymupdf is not installed; skipped")
+    else:
+        results += [verify_backends(path) for path in paths]
+
+    print("=" * 60)
+    if all(results):
+        print("\n✓✓✓ ALL ENGINES AND BACKENDS AGREE ✓✓✓\n")
+        return 0
+    print("\n✗✗✗ ENGINES OR BACKENDS DIFFER ✗✗✗\n")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -34,7 +34,7 @@ def verify_lecture_parser():
         print(f"✓ Successfully parsed {len(events)} lecture events")
         
         # Verify multi-day splitting (Monday\nWednesday should create 2 events)
-        cos214_lectures = [e for e in events if e.get('Activity') == 'Lecture']
+        cos214_lectures = [e for e in events if e.activity == 'Lecture']
         if len(cos214_lectures) == 2:
             print("✓ Multi-day lecture splitting works correctly (2 events from Monday\\nWednesday)")
         else:
@@ -42,9 +42,9 @@ def verify_lecture_parser():
             return False
         
         # Verify required fields are present
-        required_fields = ['Module', 'Activity', 'Group', 'Day', 'Time', 'Venue']
+        required_fields = ['module', 'activity', 'group', 'day', 'time', 'venue']
         for event in events:
-            missing_fields = [f for f in required_fields if f not in event or not event[f]]
+            missing_fields = [f for f in required_fields if not getattr(event, f)]
             if missing_fields:
                 print(f"✗ Event missing required fields: {missing_fields}")
                 return False
@@ -55,7 +55,7 @@ def verify_lecture_parser():
         print(f"✓ Data processor successfully processed {len(processed)} lecture events")
         
         # Verify isRecurring flag is set correctly
-        recurring_count = sum(1 for e in processed if e.get('isRecurring') == True)
+        recurring_count = sum(1 for e in processed if e.is_recurring == True)
         if recurring_count == len(processed):
             print(f"✓ All {len(processed)} lecture events are marked as recurring")
         else:
@@ -92,7 +92,7 @@ def verify_test_parser():
         print(f"✓ Successfully parsed {len(events)} test events")
         
         # Verify multi-venue splitting (IT 4-4\nIT 4-5 should create 2 events)
-        test1_events = [e for e in events if e.get('Test') == 'Test 1']
+        test1_events = [e for e in events if e.activity == 'Test 1']
         if len(test1_events) == 2:
             print("✓ Multi-venue test splitting works correctly (2 events from IT 4-4\\nIT 4-5)")
         else:
@@ -100,9 +100,9 @@ def verify_test_parser():
             return False
         
         # Verify required fields are present
-        required_fields = ['Module', 'Test', 'Date', 'Time', 'Venue']
+        required_fields = ['module', 'activity', 'date', 'time', 'venue']
         for event in events:
-            missing_fields = [f for f in required_fields if f not in event or not event[f]]
+            missing_fields = [f for f in required_fields if not getattr(event, f)]
             if missing_fields:
                 print(f"✗ Event missing required fields: {missing_fields}")
                 return False
@@ -113,7 +113,7 @@ def verify_test_parser():
         print(f"✓ Data processor successfully processed {len(processed)} test events")
         
         # Verify isRecurring flag is set correctly
-        non_recurring_count = sum(1 for e in processed if e.get('isRecurring') == False)
+        non_recurring_count = sum(1 for e in processed if e.is_recurring == False)
         if non_recurring_count == len(processed):
             print(f"✓ All {len(processed)} test events are marked as non-recurring")
         else: